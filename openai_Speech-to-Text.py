@@ -5,23 +5,55 @@
 # Import the required modules
 import os
 from pathlib import Path
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import time
 from tqdm import tqdm
 from pydub import AudioSegment
+from pydub.utils import mediainfo_json
 import base64
 import json
 import logging
 from datetime import datetime
 import shutil
 import hashlib
-from typing import Optional, Dict, List, Union
+import argparse
+import asyncio
+import math
+import re
+from bisect import bisect_left, bisect_right
+import subprocess
+import tempfile
+import threading
+from contextlib import nullcontext
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List, Union, Iterator
 
 # Constants
 SUPPORTED_FORMATS = ['mp3', 'mp4', 'mpeg', 'mpga', 'm4a', 'wav', 'webm']
 MAX_FILE_SIZE = 25 * 1024 * 1024  # 25 MB
 COST_PER_MINUTE = 0.006  # USD per minute
 EUR_RATE = 0.93
+MAX_CONCURRENT_UPLOADS = 4  # Chunks in flight at once for large files
+CHUNK_MAX_RETRIES = 3
+CHUNK_TARGET_BYTES = int(MAX_FILE_SIZE * 0.9)  # Headroom under the upload limit
+CHUNK_MIN_BITRATE_KBPS = 32
+CHUNK_MAX_BITRATE_KBPS = 128
+CHUNK_OVERLAP_SECONDS = 2.0
+CUT_SEARCH_SECONDS = 60  # How far before the size target to look for silence
+SILENCE_THRESHOLD_DB = -35
+SILENCE_MIN_SECONDS = 0.4
+TRANSCODE_POLICIES = ['always', 'above', 'never']
+TRANSCODE_ABOVE_BYTES = 5 * 1024 * 1024  # Threshold for the 'above' policy
+SPEECH_SAMPLE_RATE = 16000  # Whisper resamples to 16 kHz mono anyway
+SPEECH_BITRATE_KBPS = 32
+TRIM_MIN_SILENCE_SECONDS = 2.0  # Only silences at least this long are cut out
+TRIM_PADDING_SECONDS = 0.3  # Kept either side of speech so words aren't clipped
+CHUNK_SPILL_BYTES = None  # Chunks predicted above this many bytes go to temp/ instead of RAM
+BATCH_WORKERS = 2  # Files in flight at once; each may also fan out into chunk uploads
+BATCH_MANIFEST = Path("transcripts") / "batch_manifest.json"
+CACHE_DIR = Path("cache") / "transcripts"
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Least recently used entries are evicted past this
 
 SUPPORTED_LANGUAGES = {
     'en': 'English', 'es': 'Spanish', 'fr': 'French', 
@@ -32,6 +64,9 @@ SUPPORTED_LANGUAGES = {
 
 OUTPUT_FORMATS = ['text', 'json', 'srt', 'vtt', 'verbose_json']
 
+# A path on disk, or an in-memory (filename, bytes) pair the OpenAI client uploads as-is
+AudioSource = Union[str, Path, tuple[str, bytes]]
+
 logging.basicConfig(
     filename='speech_to_text.log',
     level=logging.INFO,
@@ -39,15 +74,244 @@ logging.basicConfig(
 )
 
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 def clear_screen():
     os.system('clear' if os.name != 'nt' else 'cls')
 
+SUBTITLE_TIME_RE = re.compile(r"^([\d:.,]+) --> ([\d:.,]+)(.*)$", re.MULTILINE)
+
+def parse_timestamp(value: str) -> float:
+    seconds = 0.0
+    for part in value.replace(',', '.').split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    millis = int(round(max(seconds, 0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+def shift_subtitle_times(text: str, mapper) -> str:
+    # Rewrite every srt/vtt cue time through mapper(seconds, is_end)
+    def replace(match):
+        separator = "," if "," in match.group(1) else "."
+        start = format_timestamp(mapper(parse_timestamp(match.group(1)), False), separator)
+        end = format_timestamp(mapper(parse_timestamp(match.group(2)), True), separator)
+        return f"{start} --> {end}{match.group(3)}"
+    return SUBTITLE_TIME_RE.sub(replace, text)
+
+def dedupe_overlap_text(previous: str, current: str, max_words: int = 40) -> str:
+    # Drop the longest run of words that repeats the end of the previous chunk
+    def normalize(words):
+        return [w.strip(".,!?;:\"'").lower() for w in words]
+
+    previous_words = normalize(previous.split()[-max_words:])
+    current_words = current.split()
+    for size in range(min(len(previous_words), len(current_words)), 0, -1):
+        if previous_words[-size:] == normalize(current_words[:size]):
+            return " ".join(current_words[size:])
+    return current
+
+class TranscriptMerger:
+    # Combines per-chunk verbose_json results into one text/json/srt/vtt/verbose_json
+    # document. Chunks may finish in any order; each is written out as soon as every
+    # chunk before it has arrived, with cues renumbered and times shifted to the
+    # source timeline.
+    def __init__(self, output_format: str = "verbose_json", output=None, time_map=None):
+        self.output_format = output_format
+        self.output = output
+        self.time_map = time_map
+        self.plan = []
+        self.boundaries = []
+        self.language = None
+        self.segments = []
+        self.words = []
+        self.texts = []
+        self.chunks_merged = 0
+        self.failed_chunks = []
+        self.reused_cost = 0.0  # Cost of the chunks taken from the cache instead of sent
+        self._pieces = []
+        self._waiting = {}
+        self._next = 0
+
+    def _write(self, piece: str):
+        if self.output_format in ("srt", "vtt"):
+            self._pieces.append(piece)
+        if self.output:
+            self.output.write(piece)
+            self.output.flush()
+
+    def _time(self, seconds: float, is_end: bool = False) -> float:
+        return self.time_map(seconds, is_end) if self.time_map else seconds
+
+    def start(self, plan: List[tuple[float, float]]):
+        # Each chunk owns the timeline from the middle of its leading overlap to the
+        # middle of its trailing one
+        self.plan = plan
+        self.boundaries = [0.0] + [(plan[i][0] + plan[i - 1][1]) / 2 for i in range(1, len(plan))]
+        self.boundaries.append(float("inf"))
+        if self.output_format == "vtt":
+            self._write("WEBVTT\n\n")
+        elif self.output_format == "verbose_json":
+            self._write('{\n  "segments": [')
+
+    def add(self, index: int, result: Optional[dict]):
+        # A failed chunk is added as None so it doesn't hold back the ones after it
+        if result is None:
+            self.failed_chunks.append(index)
+        self._waiting[index] = result
+        while self._next in self._waiting:
+            chunk = self._waiting.pop(self._next)
+            if chunk:
+                self._emit(self._next, chunk)
+            self._next += 1
+
+    def _emit(self, index: int, result: dict):
+        offset, lower, upper = self.plan[index][0], self.boundaries[index], self.boundaries[index + 1]
+        self.language = self.language or result.get("language")
+
+        def shift(item: dict) -> dict:
+            return {**item, "start": self._time(item["start"] + offset),
+                    "end": self._time(item["end"] + offset, True)}
+
+        segments = [shift(seg) for seg in result.get("segments") or []
+                    if lower <= seg["start"] + offset < upper]
+        words = [shift(word) for word in result.get("words") or []
+                 if lower <= word["start"] + offset < upper]
+        if result.get("segments"):
+            # The boundary filter already drops the overlap, so the text matches the segments
+            text = " ".join(seg["text"].strip() for seg in segments)
+        else:
+            # Text-only fallback: nothing to filter by time, so trim the repeated words instead
+            text = (result.get("text") or "").strip()
+            if self.texts:
+                text = dedupe_overlap_text(self.texts[-1], text)
+
+        for seg in segments:
+            seg["id"] = len(self.segments)
+            if self.output_format == "srt":
+                self._write(f"{seg['id'] + 1}\n{format_timestamp(seg['start'])} --> "
+                            f"{format_timestamp(seg['end'])}\n{seg['text'].strip()}\n\n")
+            elif self.output_format == "vtt":
+                self._write(f"{format_timestamp(seg['start'], '.')} --> "
+                            f"{format_timestamp(seg['end'], '.')}\n{seg['text'].strip()}\n\n")
+            elif self.output_format == "verbose_json":
+                separator = "," if self.segments else ""
+                self._write(f"{separator}\n    {json.dumps(seg, ensure_ascii=False)}")
+            self.segments.append(seg)
+        self.words.extend(words)
+
+        if text:
+            if self.output_format == "text":
+                self._write(f" {text}" if self.texts else text)
+            self.texts.append(text)
+        self.chunks_merged += 1
+
+    def close(self):
+        if self.output_format == "verbose_json":
+            tail = {"text": " ".join(self.texts), "language": self.language,
+                    "duration": self._time(self.plan[-1][1], True) if self.plan else 0}
+            if self.words:
+                tail["words"] = self.words
+            body = json.dumps(tail, indent=2, ensure_ascii=False)[1:]
+            self._write(f"\n  ],{body}\n")
+        elif self.output_format == "json":
+            self._write(json.dumps({"text": " ".join(self.texts)}, indent=2, ensure_ascii=False))
+
+    @property
+    def result(self) -> Union[str, dict]:
+        text = " ".join(self.texts)
+        if self.output_format in ("srt", "vtt"):
+            return "".join(self._pieces)
+        if self.output_format == "text":
+            return text
+        if self.output_format == "json":
+            return {"text": text}
+        merged = {"text": text, "language": self.language,
+                  "duration": self._time(self.plan[-1][1], True) if self.plan else 0,
+                  "segments": self.segments}
+        if self.words:
+            merged["words"] = self.words
+        return merged
+
+class TranscriptCache:
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def file_hash(self, file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, audio_hash: str, **params) -> str:
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(f"{audio_hash}:{payload}".encode()).hexdigest()
+
+    def get(self, key: str):
+        entry_file = self.cache_dir / f"{key}.json"
+        with self._lock:
+            try:
+                with open(entry_file, encoding='utf-8') as f:
+                    value = json.load(f)
+                os.utime(entry_file)  # mtime doubles as the LRU clock
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value):
+        entry_file = self.cache_dir / f"{key}.json"
+        temp_file = entry_file.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        with self._lock:
+            os.replace(temp_file, entry_file)
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
 class AudioProcessor:
-    def __init__(self):
+    def __init__(self, max_workers: int = MAX_CONCURRENT_UPLOADS, use_cache: bool = True,
+                 chunk_spill_bytes: Optional[int] = CHUNK_SPILL_BYTES,
+                 transcode_policy: str = "never", transcode_above_bytes: int = TRANSCODE_ABOVE_BYTES,
+                 trim_silence: bool = False, chunk_overlap: float = CHUNK_OVERLAP_SECONDS):
+        if transcode_policy not in TRANSCODE_POLICIES:
+            raise ValueError(f"Unknown transcode policy: {transcode_policy}")
+        self.max_workers = max(1, max_workers)
+        self.chunk_spill_bytes = chunk_spill_bytes
+        self.transcode_policy = transcode_policy
+        self.transcode_above_bytes = transcode_above_bytes
+        self.bytes_saved = 0
+        self.trim_silence = trim_silence
+        self.chunk_overlap = max(0.0, chunk_overlap)
+        self.trimmed_minutes = 0
+        self.trim_cost_avoided = 0
+        self.cache = TranscriptCache() if use_cache else None
         self.total_cost = 0
+        self.cost_avoided = 0
         self.processed_files = 0
         self.failed_files = []
+        self._lock = threading.Lock()
+        self._probe_cache: Dict[tuple, dict] = {}
+        self._silence_cache: Dict[tuple, list] = {}
         self.setup_directories()
 
     def setup_directories(self):
@@ -59,6 +323,33 @@ class AudioProcessor:
         cost_usd = duration_minutes * COST_PER_MINUTE
         return cost_usd * EUR_RATE
 
+    def probe_audio(self, file_path: str) -> dict:
+        # Read container/stream headers via ffprobe instead of decoding to PCM
+        stat = os.stat(file_path)
+        cache_key = (os.path.abspath(file_path), stat.st_mtime_ns)
+        if cache_key in self._probe_cache:
+            return self._probe_cache[cache_key]
+
+        info = mediainfo_json(file_path)
+        streams = [s for s in info.get('streams', []) if s.get('codec_type') == 'audio']
+        if not streams:
+            raise ValueError("No audio stream found")
+        stream = streams[0]
+        container = info.get('format', {})
+        duration = float(container.get('duration') or stream.get('duration') or 0)
+        bit_rate = container.get('bit_rate') or stream.get('bit_rate')
+
+        probe = {
+            "duration_seconds": duration,
+            "codec": stream.get('codec_name'),
+            "channels": int(stream.get('channels') or 0),
+            "sample_rate": int(stream.get('sample_rate') or 0),
+            "bit_rate": int(bit_rate) if bit_rate else int(stat.st_size * 8 / duration) if duration else 0,
+            "size": stat.st_size
+        }
+        self._probe_cache[cache_key] = probe
+        return probe
+
     def validate_audio_file(self, file_path: str) -> tuple[bool, str]:
         try:
             if not os.path.exists(file_path):
@@ -68,105 +359,578 @@ class AudioProcessor:
                 return False, f"Unsupported format: {extension}"
             if os.path.getsize(file_path) == 0:
                 return False, "File is empty"
-            AudioSegment.from_file(file_path)
+            if self.probe_audio(file_path)["duration_seconds"] <= 0:
+                return False, "Audio has no duration"
             return True, "Valid audio file"
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
+    def _add_cost(self, spent: float = 0.0, avoided: float = 0.0):
+        with self._lock:
+            self.total_cost += spent
+            self.cost_avoided += avoided
+
+    def _add_bytes_saved(self, saved: float):
+        # Net upload saving against the source file; a re-encode that grows is counted too
+        with self._lock:
+            self.bytes_saved += int(round(saved))
+
+    def should_transcode(self, probe: dict) -> bool:
+        if self.transcode_policy == "always":
+            return True
+        if self.transcode_policy == "above":
+            return probe["size"] > self.transcode_above_bytes
+        return False
+
+    def transcode_for_speech(self, file_path: str, probe: dict) -> Optional[AudioSource]:
+        # Mono 16 kHz low-bitrate mp3 in memory; only used if it actually shrinks the upload
+        data = self.export_segment(file_path, 0, probe["duration_seconds"],
+                                   bitrate_kbps=SPEECH_BITRATE_KBPS, speech=True)
+        saved = probe["size"] - len(data)
+        if saved <= 0:
+            return None
+        self._add_bytes_saved(saved)
+        print(f"Transcoded for upload: {probe['size'] / (1024 * 1024):.1f}MB -> "
+              f"{len(data) / (1024 * 1024):.1f}MB")
+        return (f"{Path(file_path).stem}.mp3", data)
+
+    def remove_silence(self, file_path: str, probe: dict,
+                       speech: bool = False) -> Optional[tuple[Path, List[tuple[float, float]]]]:
+        # Cut long silent stretches into a temp file. The returned offset map holds
+        # (trimmed_start, original_start) for every kept span, in order.
+        duration = probe["duration_seconds"]
+        keep = []
+        cursor = 0.0
+        for start, end in self.detect_silences(file_path):
+            if end - start < TRIM_MIN_SILENCE_SECONDS:
+                continue
+            if start + TRIM_PADDING_SECONDS > cursor:
+                keep.append((cursor, start + TRIM_PADDING_SECONDS))
+            cursor = max(cursor, end - TRIM_PADDING_SECONDS)
+        if cursor < duration:
+            keep.append((cursor, duration))
+        if duration - sum(end - start for start, end in keep) < 1:
+            return None
+
+        offset_map = []
+        trimmed_time = 0.0
+        for start, end in keep:
+            offset_map.append((trimmed_time, start))
+            trimmed_time += end - start
+
+        # One between() term per kept span; a long recording with many pauses can outgrow
+        # the per-argument limit, so the filter goes to ffmpeg in a script file
+        expression = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in keep)
+        fd, filter_name = tempfile.mkstemp(prefix=f"{Path(file_path).stem}_filter_",
+                                           suffix=".txt", dir="temp")
+        with os.fdopen(fd, "w") as f:
+            f.write(f"aselect='{expression}',asetpts=N/SR/TB")
+        fd, temp_name = tempfile.mkstemp(prefix=f"{Path(file_path).stem}_trimmed_",
+                                         suffix=".mp3", dir="temp")
+        os.close(fd)
+        command = [
+            AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y",
+            "-i", file_path, "-vn", "-filter_script:a", filter_name
+        ]
+        if speech:
+            command += ["-ac", "1", "-ar", str(SPEECH_SAMPLE_RATE)]
+        command += ["-b:a", f"{self._chunk_bitrate(probe, speech)}k", "-f", "mp3", temp_name]
+        try:
+            completed = subprocess.run(command, capture_output=True)
+        finally:
+            Path(filter_name).unlink(missing_ok=True)
+        if completed.returncode != 0:
+            Path(temp_name).unlink(missing_ok=True)
+            raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode(errors='ignore').strip()}")
+        return Path(temp_name), offset_map
+
+    def offset_mapper(self, offset_map: Optional[List[tuple[float, float]]]):
+        # Translate times on the trimmed timeline back to the original recording
+        if not offset_map:
+            return None
+        starts = [trimmed for trimmed, _ in offset_map]
+
+        def to_original(seconds: float, is_end: bool = False) -> float:
+            # An end time sitting exactly on a cut belongs to the span before it
+            index = (bisect_left if is_end else bisect_right)(starts, seconds) - 1
+            trimmed, original = offset_map[max(index, 0)]
+            return original + seconds - trimmed
+        return to_original
+
+    def remap_timestamps(self, result: Union[str, dict],
+                         offset_map: Optional[List[tuple[float, float]]]) -> Union[str, dict]:
+        to_original = self.offset_mapper(offset_map)
+        if not to_original:
+            return result
+        if isinstance(result, dict):
+            for key in ("segments", "words"):
+                for item in result.get(key) or []:
+                    item["start"] = to_original(item["start"])
+                    item["end"] = to_original(item["end"], True)
+            return result
+        if isinstance(result, str) and "-->" in result:
+            return shift_subtitle_times(result, to_original)
+        return result
+
+    def _record_failure(self, name: str, error: str):
+        with self._lock:
+            self.failed_files.append((name, error))
+        logging.error(f"Error processing {name}: {error}")
+
     def process_audio(self, file_path: str, task: str = "transcribe", 
                      language: Optional[str] = None, timestamps: bool = False, 
                      output_format: str = "text", prompt: Optional[str] = None) -> Optional[dict]:
         try:
-            is_valid, message = self.validate_audio_file(file_path)
-            if not is_valid:
-                raise ValueError(message)
+            return self._process_file(file_path, task, language, timestamps,
+                                      output_format, prompt)["result"]
+        except Exception as e:
+            self._record_failure(file_path, str(e))
+            print(f"\nError: {str(e)}")
+            return None
+
+    def _process_file(self, file_path: str, task: str = "transcribe",
+                      language: Optional[str] = None, timestamps: bool = False,
+                      output_format: str = "text", prompt: Optional[str] = None) -> dict:
+        job = self._prepare_job(file_path, task, language, timestamps, output_format, prompt)
+        if not job["cached"]:
+            try:
+                job["result"], job["output_format"] = self._transcribe(
+                    job, task, language, timestamps, output_format, prompt)
+            finally:
+                self._cleanup_job(job)
+        return self._finish_job(job, task)
 
-            audio = AudioSegment.from_file(file_path)
-            duration_minutes = len(audio) / (1000 * 60)
-            cost_eur = self.calculate_cost(duration_minutes)
-            self.total_cost += cost_eur
+    def _prepare_job(self, file_path: str, task: str, language: Optional[str],
+                     timestamps: bool, output_format: str, prompt: Optional[str]) -> dict:
+        # Everything before the upload: validation, probing, cache lookup, silence trimming
+        is_valid, message = self.validate_audio_file(file_path)
+        if not is_valid:
+            raise ValueError(message)
 
-            print(f"\nProcessing: {os.path.basename(file_path)}")
-            print(f"Duration: {duration_minutes:.2f} minutes")
-            print(f"Estimated cost: €{cost_eur:.4f}")
+        probe = self.probe_audio(file_path)
+        duration_minutes = probe["duration_seconds"] / 60
+        cost_eur = self.calculate_cost(duration_minutes)
 
-            file_size = os.path.getsize(file_path)
-            if file_size > MAX_FILE_SIZE:
-                return self.split_and_process(file_path, task, language)
+        print(f"\nProcessing: {os.path.basename(file_path)}")
+        print(f"Duration: {duration_minutes:.2f} minutes")
+        print(f"Format: {probe['codec']}, {probe['channels']}ch, {probe['bit_rate'] // 1000} kbps")
+        print(f"Estimated cost: €{cost_eur:.4f}")
 
-            with tqdm(total=100, desc="Processing") as pbar:
-                result = self._process_single_file(file_path, task, language, 
-                                                timestamps, output_format, prompt, pbar)
+        job = {"file_path": file_path, "duration_minutes": duration_minutes, "cost_eur": cost_eur,
+               "cached": False, "output_format": output_format, "cache_key": None,
+               "chunk_hash": None, "offset_map": None, "output_file": None}
+        if self.cache:
+            job["chunk_hash"] = self.cache.file_hash(file_path)
+            job["cache_key"] = self.cache.make_key(job["chunk_hash"], task=task, language=language,
+                                                   output_format=output_format,
+                                                   timestamps=timestamps, prompt=prompt,
+                                                   trim_silence=self.trim_silence)
+            cached = self.cache.get(job["cache_key"])
+            if cached is not None:
+                print("Cache hit: reusing previous result")
+                self._add_cost(avoided=cost_eur)
+                job.update(result=cached["result"], output_format=cached["output_format"],
+                           cost_eur=0.0, cached=True)
+                return job
 
-            output_file = self.save_output(result, task, output_format)
+        speech = self.should_transcode(probe)
+        work_path = file_path
+        if self.trim_silence:
+            try:
+                trimmed = self.remove_silence(file_path, probe, speech)
+            except Exception as e:
+                # Trimming only saves cost; the untrimmed file still transcribes
+                logging.warning(f"Silence trimming failed for {file_path}: {str(e)}")
+                print(f"Silence trimming failed - sending the untrimmed audio ({str(e)})")
+                trimmed = None
+            if trimmed:
+                work_path, job["offset_map"] = str(trimmed[0]), trimmed[1]
+                # The trimmed copy is already speech-encoded when that policy applies
+                speech = False
+                if job["chunk_hash"]:
+                    job["chunk_hash"] += ":trimmed"
+        job.update(work_path=work_path, speech=speech)
+
+        try:
+            work_probe = self.probe_audio(work_path)
+        except Exception:
+            self._cleanup_job(job)
+            raise
+        if job["offset_map"]:
+            trimmed_cost = self.calculate_cost(work_probe["duration_seconds"] / 60)
+            removed_minutes = (probe["duration_seconds"] - work_probe["duration_seconds"]) / 60
+            print(f"Silence removed: {removed_minutes:.2f} minutes "
+                  f"(saves €{cost_eur - trimmed_cost:.4f})")
+            with self._lock:
+                self.trimmed_minutes += removed_minutes
+                self.trim_cost_avoided += cost_eur - trimmed_cost
+            self._add_bytes_saved(probe["size"] - work_probe["size"])
+            job["cost_eur"] = trimmed_cost
+        job["work_probe"] = work_probe
+        self._add_cost(spent=job["cost_eur"])
+        return job
+
+    def _cleanup_job(self, job: dict):
+        if job["offset_map"]:
+            Path(job["work_path"]).unlink(missing_ok=True)
+
+    def _finish_job(self, job: dict, task: str) -> dict:
+        result, output_format = job["result"], job["output_format"]
+        if not job["cached"]:
+            # Merged split output was already remapped and written while chunks finished
+            if not job["output_file"]:
+                result = self.remap_timestamps(result, job["offset_map"])
+            if self.cache:
+                self.cache.put(job["cache_key"], {"result": result, "output_format": output_format})
+
+        output_file = job["output_file"] or self.save_output(result, task, output_format,
+                                                             source=job["file_path"])
+        with self._lock:
             self.processed_files += 1
-            logging.info(f"Processed {file_path} -> {output_file}")
-            return result
+        logging.info(f"Processed {job['file_path']} -> {output_file}")
+        return {"duration_minutes": job["duration_minutes"], "cost_eur": job["cost_eur"],
+                "cached": job["cached"], "result": result, "output_file": str(output_file)}
 
-        except Exception as e:
-            self.failed_files.append((file_path, str(e)))
-            logging.error(f"Error processing {file_path}: {str(e)}")
-            print(f"\nError: {str(e)}")
-            return None
+    def _needs_split(self, job: dict) -> bool:
+        probe = job["work_probe"]
+        upload_bytes = probe["size"]
+        if job["speech"]:
+            upload_bytes = min(upload_bytes, probe["duration_seconds"] * SPEECH_BITRATE_KBPS * 1000 / 8)
+        return upload_bytes > MAX_FILE_SIZE
 
-    def _process_single_file(self, file_path: str, task: str, language: Optional[str],
+    def _open_merger(self, job: dict, task: str, output_format: str,
+                     timestamps: bool) -> TranscriptMerger:
+        output_format = "verbose_json" if timestamps else output_format
+        output_file, handle = self._open_output(task, output_format, job["file_path"])
+        job["output_file"] = output_file
+        return TranscriptMerger(output_format, handle, self.offset_mapper(job["offset_map"]))
+
+    def _close_merger(self, job: dict, merger: TranscriptMerger, succeeded: bool):
+        try:
+            if succeeded:
+                merger.close()
+        finally:
+            merger.output.close()
+            if not succeeded:
+                job["output_file"].unlink(missing_ok=True)
+                job["output_file"] = None
+
+    def _split_failure(self, merger: TranscriptMerger) -> str:
+        if merger.failed_chunks and merger.plan:
+            return (f"{len(merger.failed_chunks)} of {len(merger.plan)} chunks failed; "
+                    f"rerun to send only the missing chunks")
+        return "No chunks could be processed"
+
+    def _transcribe(self, job: dict, task: str, language: Optional[str], timestamps: bool,
+                    output_format: str, prompt: Optional[str]) -> tuple[Union[str, dict], str]:
+        file_path = job["work_path"]
+        if self._needs_split(job):
+            merger = self._open_merger(job, task, output_format, timestamps)
+            result = None
+            try:
+                result = self.split_and_process(file_path, task, language, timestamps, prompt,
+                                                audio_hash=job["chunk_hash"], speech=job["speech"],
+                                                merger=merger)
+            finally:
+                self._close_merger(job, merger, result is not None)
+            # Chunks reused from an earlier run were not billed again
+            job["cost_eur"] = max(0.0, job["cost_eur"] - merger.reused_cost)
+            if result is None:
+                raise ValueError(self._split_failure(merger))
+            return result, merger.output_format
+
+        source = None
+        if job["speech"]:
+            source = self.transcode_for_speech(file_path, job["work_probe"])
+        with tqdm(total=100, desc="Processing") as pbar:
+            result = self._process_single_file(source or file_path, task, language, 
+                                            timestamps, output_format, prompt, pbar)
+        if not isinstance(result, str):
+            result = self._response_to_dict(result)
+        return result, output_format
+
+    def _request_kwargs(self, task: str, language: Optional[str], timestamps: bool,
+                        output_format: str, prompt: Optional[str]) -> dict:
+        if task == "transcribe":
+            return {
+                "model": "whisper-1",
+                "response_format": "verbose_json" if timestamps else output_format,
+                "language": language,
+                "prompt": prompt,
+                "timestamp_granularities": ["word"] if timestamps else None
+            }
+        return {"model": "whisper-1", "response_format": output_format, "prompt": prompt}
+
+    def _process_single_file(self, file_path: AudioSource, task: str, language: Optional[str],
                            timestamps: bool, output_format: str, 
-                           prompt: Optional[str], pbar: tqdm) -> dict:
-        with open(file_path, "rb") as audio_file:
+                           prompt: Optional[str], pbar: Optional[tqdm] = None) -> dict:
+        in_memory = isinstance(file_path, tuple)
+        kwargs = self._request_kwargs(task, language, timestamps, output_format, prompt)
+        with nullcontext(file_path) if in_memory else open(file_path, "rb") as audio_file:
             if task == "transcribe":
-                response = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="verbose_json" if timestamps else output_format,
-                    language=language,
-                    prompt=prompt,
-                    timestamp_granularities=["word"] if timestamps else None
-                )
+                response = client.audio.transcriptions.create(file=audio_file, **kwargs)
             else:
-                response = client.audio.translations.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format=output_format,
-                    prompt=prompt
-                )
-            pbar.update(100)
+                response = client.audio.translations.create(file=audio_file, **kwargs)
+            if pbar:
+                pbar.update(100)
             return response
 
-    def split_and_process(self, file_path: str, task: str, language: Optional[str]) -> Optional[str]:
+    def _process_chunk(self, chunk: AudioSource, task: str, language: Optional[str],
+                       timestamps: bool, prompt: Optional[str],
+                       cache_key: Optional[str] = None) -> dict:
+        # Chunks we cut ourselves are known-good, so they go straight to upload
+        # without another validation decode. Each one is retried on its own so a
+        # single flaky upload doesn't sink the whole file.
+        name = chunk[0] if isinstance(chunk, tuple) else Path(chunk).name
+        for attempt in range(1, CHUNK_MAX_RETRIES + 1):
+            try:
+                response = self._process_single_file(chunk, task, language,
+                                                     timestamps, "verbose_json", prompt)
+                result = self._response_to_dict(response)
+                if self.cache and cache_key:
+                    self.cache.put(cache_key, result)
+                return result
+            except Exception as e:
+                if attempt == CHUNK_MAX_RETRIES:
+                    raise
+                logging.warning(f"Chunk {name} attempt {attempt} failed: {str(e)}")
+                time.sleep(2 ** attempt)
+
+    def _response_to_dict(self, response) -> dict:
+        if hasattr(response, "model_dump"):
+            return response.model_dump()
+        if isinstance(response, str):
+            try:
+                return json.loads(response)
+            except ValueError:
+                return {"text": response}
+        return dict(response)
+
+    def detect_silences(self, file_path: str) -> List[tuple[float, float]]:
+        # silencedetect streams through ffmpeg, so this costs CPU but not memory
+        cache_key = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns)
+        if cache_key in self._silence_cache:
+            return self._silence_cache[cache_key]
+
+        command = [
+            AudioSegment.converter, "-hide_banner", "-nostats", "-i", file_path, "-vn",
+            "-af", f"silencedetect=noise={SILENCE_THRESHOLD_DB}dB:d={SILENCE_MIN_SECONDS}",
+            "-f", "null", "-"
+        ]
+        completed = subprocess.run(command, capture_output=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode(errors='ignore').strip()}")
+
+        silences = []
+        start = None
+        for line in completed.stderr.decode(errors='ignore').splitlines():
+            match = re.search(r"silence_(start|end): (-?[\d.]+)", line)
+            if not match:
+                continue
+            if match.group(1) == "start":
+                start = max(float(match.group(2)), 0.0)
+            elif start is not None:
+                silences.append((start, float(match.group(2))))
+                start = None
+        self._silence_cache[cache_key] = silences
+        return silences
+
+    def _chunk_bitrate(self, probe: dict, speech: bool = False) -> int:
+        if speech:
+            return SPEECH_BITRATE_KBPS
+        return min(max(probe["bit_rate"] // 1000, CHUNK_MIN_BITRATE_KBPS), CHUNK_MAX_BITRATE_KBPS)
+
+    def plan_chunks(self, file_path: str, overlap: Optional[float] = None,
+                    speech: bool = False) -> tuple[List[tuple[float, float]], int]:
+        # Size each chunk to the byte budget, then pull the cut back to the nearest silence;
+        # overlap defaults to the processor's chunk_overlap
+        overlap = self.chunk_overlap if overlap is None else overlap
+        probe = self.probe_audio(file_path)
+        duration = probe["duration_seconds"]
+        bitrate_kbps = self._chunk_bitrate(probe, speech)
+        target_seconds = CHUNK_TARGET_BYTES * 8 / (bitrate_kbps * 1000)
+
+        try:
+            silences = self.detect_silences(file_path)
+        except Exception as e:
+            logging.warning(f"Silence detection failed for {file_path}: {str(e)}")
+            silences = []
+
+        plan = []
+        start = 0.0
+        while start < duration:
+            ideal_end = start + target_seconds
+            if ideal_end >= duration:
+                plan.append((start, duration))
+                break
+            candidates = [(s + e) / 2 for s, e in silences
+                          if ideal_end - CUT_SEARCH_SECONDS <= (s + e) / 2 <= ideal_end]
+            cut = max(candidates) if candidates else ideal_end
+            plan.append((start, cut))
+            start = max(cut - overlap, start + 1)
+        return plan, bitrate_kbps
+
+    def export_segment(self, file_path: str, start: float, length: float,
+                       output_file: Optional[Path] = None,
+                       bitrate_kbps: int = CHUNK_MAX_BITRATE_KBPS,
+                       speech: bool = False) -> Optional[bytes]:
+        # ffmpeg seeks and encodes just this window, so the source is never held in memory.
+        # Without an output file the encoded mp3 comes back as bytes over a pipe.
+        command = [
+            AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{length:.3f}", "-i", file_path, "-vn"
+        ]
+        if speech:
+            command += ["-ac", "1", "-ar", str(SPEECH_SAMPLE_RATE)]
+        command += ["-b:a", f"{bitrate_kbps}k", "-f", "mp3",
+                    str(output_file) if output_file else "pipe:1"]
+        completed = subprocess.run(command, capture_output=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode(errors='ignore').strip()}")
+        return None if output_file else completed.stdout
+
+    def iter_chunks(self, file_path: str, plan: List[tuple[float, float]], bitrate_kbps: int,
+                    skip: Optional[set] = None,
+                    speech: bool = False) -> Iterator[tuple[int, AudioSource]]:
+        # Lazily produce upload-ready chunks in order; the caller decides how many exist at once.
+        # Each chunk's upload saving is its share of the source bytes minus its own size.
+        stem = Path(file_path).stem
+        probe = self.probe_audio(file_path)
+        bytes_per_second = probe["size"] / probe["duration_seconds"]
+        for i, (start, end) in enumerate(plan):
+            if skip and i in skip:
+                continue
+            name = f"{stem}_chunk_{i + 1}.mp3"
+            predicted_bytes = (end - start) * bitrate_kbps * 1000 / 8
+            if self.chunk_spill_bytes is not None and predicted_bytes > self.chunk_spill_bytes:
+                fd, temp_name = tempfile.mkstemp(prefix=f"{stem}_chunk_{i + 1}_",
+                                                 suffix=".mp3", dir="temp")
+                os.close(fd)
+                try:
+                    self.export_segment(file_path, start, end - start, Path(temp_name),
+                                        bitrate_kbps, speech)
+                except Exception:
+                    Path(temp_name).unlink(missing_ok=True)
+                    raise
+                chunk, chunk_bytes = Path(temp_name), os.path.getsize(temp_name)
+            else:
+                data = self.export_segment(file_path, start, end - start,
+                                           bitrate_kbps=bitrate_kbps, speech=speech)
+                chunk, chunk_bytes = (name, data), len(data)
+            self._add_bytes_saved((end - start) * bytes_per_second - chunk_bytes)
+            yield i, chunk
+
+    def _collect_chunks(self, done: set, pending: dict, merger: TranscriptMerger,
+                        file_path: str, pbar: tqdm):
+        for future in done:
+            i, chunk = pending.pop(future)
+            try:
+                merger.add(i, future.result())
+            except Exception as e:
+                merger.add(i, None)
+                self._record_failure(f"{file_path} [chunk {i + 1}]", str(e))
+            finally:
+                if isinstance(chunk, Path):
+                    chunk.unlink(missing_ok=True)
+            pbar.update(1)
+
+    def _lookup_cached_chunks(self, file_path: str, plan: List[tuple[float, float]],
+                              bitrate_kbps: int, task: str, language: Optional[str],
+                              timestamps: bool, prompt: Optional[str], audio_hash: Optional[str],
+                              speech: bool) -> tuple[list, list, float]:
+        # Chunks that succeeded on an earlier run are not sent again;
+        # also returns what they would have cost
+        results = [None] * len(plan)
+        chunk_keys = [None] * len(plan)
+        reused_cost = 0.0
+        if not self.cache:
+            return results, chunk_keys, reused_cost
+        audio_hash = audio_hash or self.cache.file_hash(file_path)
+        for i, (start, end) in enumerate(plan):
+            chunk_keys[i] = self.cache.make_key(audio_hash, task=task, language=language,
+                                                timestamps=timestamps, prompt=prompt,
+                                                chunk=[start, end, bitrate_kbps, speech])
+            results[i] = self.cache.get(chunk_keys[i])
+            if results[i] is not None:
+                chunk_cost = self.calculate_cost((end - start) / 60)
+                self._add_cost(spent=-chunk_cost, avoided=chunk_cost)
+                reused_cost += chunk_cost
+        reused = sum(result is not None for result in results)
+        if reused:
+            print(f"Reusing {reused} cached chunks")
+        return results, chunk_keys, reused_cost
+
+    def split_and_process(self, file_path: str, task: str, language: Optional[str],
+                          timestamps: bool = False, prompt: Optional[str] = None,
+                          max_workers: Optional[int] = None,
+                          audio_hash: Optional[str] = None,
+                          speech: bool = False,
+                          merger: Optional[TranscriptMerger] = None) -> Optional[Union[str, dict]]:
         try:
             print("\nFile exceeds 25MB limit. Splitting into chunks...")
-            audio = AudioSegment.from_file(file_path)
-            chunk_length = 10 * 60 * 1000
-            chunks = [audio[i:i+chunk_length] for i in range(0, len(audio), chunk_length)]
-            
-            results = []
-            for i, chunk in enumerate(chunks, 1):
-                print(f"\nProcessing chunk {i}/{len(chunks)}")
-                temp_file = Path("temp") / f"chunk_{i}.mp3"
-                chunk.export(temp_file, format="mp3")
-                
-                result = self.process_audio(str(temp_file), task, language)
-                if result:
-                    results.append(result)
-                
-                temp_file.unlink()
-            
-            return " ".join(results) if results else None
+            plan, bitrate_kbps = self.plan_chunks(file_path, speech=speech)
+            workers = min(max_workers or self.max_workers, len(plan))
+            print(f"\nProcessing {len(plan)} chunks at {bitrate_kbps} kbps ({workers} at a time)")
+
+            merger = merger or TranscriptMerger()
+            merger.start(plan)
+            results, chunk_keys, merger.reused_cost = self._lookup_cached_chunks(
+                file_path, plan, bitrate_kbps, task, language, timestamps, prompt, audio_hash, speech)
+            cached_chunks = {i for i, result in enumerate(results) if result is not None}
+            for i in cached_chunks:
+                merger.add(i, results[i])
+
+            pending = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor, \
+                    tqdm(total=len(plan), initial=len(cached_chunks), desc="Chunks") as pbar:
+                try:
+                    for i, chunk in self.iter_chunks(file_path, plan, bitrate_kbps,
+                                                     skip=cached_chunks, speech=speech):
+                        future = executor.submit(self._process_chunk, chunk, task,
+                                                 language, timestamps, prompt, chunk_keys[i])
+                        pending[future] = (i, chunk)
+                        # Only cut the next chunk once an upload slot frees up
+                        if len(pending) >= workers:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            self._collect_chunks(done, pending, merger, file_path, pbar)
+                finally:
+                    if pending:
+                        done, _ = wait(pending)
+                        self._collect_chunks(done, pending, merger, file_path, pbar)
+
+            if merger.failed_chunks:
+                # A transcript with holes is never returned (or cached as the whole file);
+                # the chunks that did succeed are cached, so a rerun only sends the gaps
+                failed = ", ".join(str(i + 1) for i in sorted(merger.failed_chunks))
+                print(f"\n{len(merger.failed_chunks)} of {len(plan)} chunks failed ({failed})")
+                return None
+            return merger.result
             
         except Exception as e:
             logging.error(f"Error splitting audio: {str(e)}")
             print(f"\nError splitting audio: {str(e)}")
             return None
 
-    def save_output(self, response: Union[str, dict], task: str, 
-                   output_format: str) -> Path:
+    def _open_output(self, task: str, output_format: str, source: Optional[str] = None):
         output_dir = Path("transcripts") / datetime.now().strftime("%Y%m%d")
         output_dir.mkdir(parents=True, exist_ok=True)
-        
+
         timestamp = datetime.now().strftime("%H%M%S")
-        output_file = output_dir / f"{timestamp}_{task}.{output_format}"
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
+        stem = f"{timestamp}_{Path(source).stem}_{task}" if source else f"{timestamp}_{task}"
+        # Exclusive create so concurrent workers never overwrite each other's output
+        for attempt in range(1000):
+            suffix = f"_{attempt}" if attempt else ""
+            output_file = output_dir / f"{stem}{suffix}.{output_format}"
+            try:
+                return output_file, open(output_file, 'x', encoding='utf-8')
+            except FileExistsError:
+                continue
+        raise FileExistsError(f"Could not find a free output name for {stem}")
+
+    def save_output(self, response: Union[str, dict], task: str, 
+                   output_format: str, source: Optional[str] = None) -> Path:
+        output_file, f = self._open_output(task, output_format, source)
+        with f:
             if isinstance(response, dict):
                 json.dump(response, f, indent=2, ensure_ascii=False)
             else:
@@ -178,10 +942,289 @@ class AudioProcessor:
         return {
             "total_files_processed": self.processed_files,
             "total_cost_eur": round(self.total_cost, 4),
+            "cache_hits": self.cache.hits if self.cache else 0,
+            "cache_misses": self.cache.misses if self.cache else 0,
+            "cost_avoided_eur": round(self.cost_avoided, 4),
+            "upload_bytes_saved": self.bytes_saved,
+            "silence_minutes_removed": round(self.trimmed_minutes, 2),
+            "silence_cost_avoided_eur": round(self.trim_cost_avoided, 4),
             "failed_files": self.failed_files,
             "timestamp": datetime.now().isoformat()
         }
 
+class AsyncAudioProcessor(AudioProcessor):
+    # Same pipeline as AudioProcessor, but uploads go through the async client under a
+    # shared semaphore and probing/ffmpeg/cache/disk work runs in the default executor
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_UPLOADS, **kwargs):
+        super().__init__(max_workers=max_concurrency, **kwargs)
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+    # The inherited sync entry points would call the async split_and_process without
+    # awaiting it, so they refuse instead of returning a coroutine as a transcript
+    def _process_file(self, *args, **kwargs):
+        raise TypeError("AsyncAudioProcessor is async-only: use 'await process_audio(...)'")
+
+    def _transcribe(self, *args, **kwargs):
+        raise TypeError("AsyncAudioProcessor is async-only: use 'await process_audio(...)'")
+
+    async def process_audio(self, file_path: str, task: str = "transcribe",
+                            language: Optional[str] = None, timestamps: bool = False,
+                            output_format: str = "text",
+                            prompt: Optional[str] = None) -> Optional[dict]:
+        try:
+            job = await self._run_blocking(self._prepare_job, file_path, task, language,
+                                           timestamps, output_format, prompt)
+            if not job["cached"]:
+                try:
+                    job["result"], job["output_format"] = await self._transcribe_async(
+                        job, task, language, timestamps, output_format, prompt)
+                finally:
+                    await self._run_blocking(self._cleanup_job, job)
+            details = await self._run_blocking(self._finish_job, job, task)
+            return details["result"]
+        except Exception as e:
+            self._record_failure(file_path, str(e))
+            print(f"\nError: {str(e)}")
+            return None
+
+    async def _transcribe_async(self, job: dict, task: str, language: Optional[str],
+                                timestamps: bool, output_format: str,
+                                prompt: Optional[str]) -> tuple[Union[str, dict], str]:
+        file_path = job["work_path"]
+        if self._needs_split(job):
+            merger = await self._run_blocking(self._open_merger, job, task, output_format, timestamps)
+            result = None
+            try:
+                result = await self.split_and_process(file_path, task, language, timestamps, prompt,
+                                                      audio_hash=job["chunk_hash"],
+                                                      speech=job["speech"], merger=merger)
+            finally:
+                await self._run_blocking(self._close_merger, job, merger, result is not None)
+            job["cost_eur"] = max(0.0, job["cost_eur"] - merger.reused_cost)
+            if result is None:
+                raise ValueError(self._split_failure(merger))
+            return result, merger.output_format
+
+        source = None
+        if job["speech"]:
+            source = await self._run_blocking(self.transcode_for_speech, file_path, job["work_probe"])
+        result = await self._upload(source or file_path, task, language, timestamps,
+                                    output_format, prompt)
+        if not isinstance(result, str):
+            result = self._response_to_dict(result)
+        return result, output_format
+
+    async def _upload(self, source: AudioSource, task: str, language: Optional[str],
+                      timestamps: bool, output_format: str, prompt: Optional[str]):
+        # Spilled chunks are streamed from disk, as in the sync path, rather than read
+        # back into memory
+        in_memory = isinstance(source, tuple)
+        kwargs = self._request_kwargs(task, language, timestamps, output_format, prompt)
+        with nullcontext(source) if in_memory else open(source, "rb") as audio_file:
+            async with self._semaphore:
+                if task == "transcribe":
+                    return await async_client.audio.transcriptions.create(file=audio_file, **kwargs)
+                return await async_client.audio.translations.create(file=audio_file, **kwargs)
+
+    async def _process_chunk_async(self, chunk: AudioSource, task: str, language: Optional[str],
+                                   timestamps: bool, prompt: Optional[str],
+                                   cache_key: Optional[str] = None) -> dict:
+        name = chunk[0] if isinstance(chunk, tuple) else Path(chunk).name
+        for attempt in range(1, CHUNK_MAX_RETRIES + 1):
+            try:
+                response = await self._upload(chunk, task, language, timestamps,
+                                              "verbose_json", prompt)
+                result = self._response_to_dict(response)
+                if self.cache and cache_key:
+                    await self._run_blocking(self.cache.put, cache_key, result)
+                return result
+            except Exception as e:
+                if attempt == CHUNK_MAX_RETRIES:
+                    raise
+                logging.warning(f"Chunk {name} attempt {attempt} failed: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+
+    async def split_and_process(self, file_path: str, task: str, language: Optional[str],
+                                timestamps: bool = False, prompt: Optional[str] = None,
+                                max_workers: Optional[int] = None,
+                                audio_hash: Optional[str] = None,
+                                speech: bool = False,
+                                merger: Optional[TranscriptMerger] = None) -> Optional[Union[str, dict]]:
+        try:
+            print("\nFile exceeds 25MB limit. Splitting into chunks...")
+            plan, bitrate_kbps = await self._run_blocking(self.plan_chunks, file_path, speech=speech)
+            workers = min(max_workers or self.max_workers, len(plan))
+            print(f"\nProcessing {len(plan)} chunks at {bitrate_kbps} kbps ({workers} at a time)")
+
+            merger = merger or TranscriptMerger()
+            merger.start(plan)
+            results, chunk_keys, merger.reused_cost = await self._run_blocking(
+                self._lookup_cached_chunks, file_path, plan, bitrate_kbps, task, language,
+                timestamps, prompt, audio_hash, speech)
+            cached_chunks = {i for i, result in enumerate(results) if result is not None}
+            for i in cached_chunks:
+                merger.add(i, results[i])
+            chunks = self.iter_chunks(file_path, plan, bitrate_kbps, skip=cached_chunks, speech=speech)
+
+            pending = {}
+            with tqdm(total=len(plan), initial=len(cached_chunks), desc="Chunks") as pbar:
+                try:
+                    while True:
+                        item = await self._run_blocking(next, chunks, None)
+                        if item is None:
+                            break
+                        i, chunk = item
+                        upload = asyncio.ensure_future(self._process_chunk_async(
+                            chunk, task, language, timestamps, prompt, chunk_keys[i]))
+                        pending[upload] = (i, chunk)
+                        # Only cut the next chunk once an upload slot frees up
+                        if len(pending) >= workers:
+                            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                            self._collect_chunks(done, pending, merger, file_path, pbar)
+                finally:
+                    if pending:
+                        done, _ = await asyncio.wait(pending)
+                        self._collect_chunks(done, pending, merger, file_path, pbar)
+
+            if merger.failed_chunks:
+                # A transcript with holes is never returned (or cached as the whole file);
+                # the chunks that did succeed are cached, so a rerun only sends the gaps
+                failed = ", ".join(str(i + 1) for i in sorted(merger.failed_chunks))
+                print(f"\n{len(merger.failed_chunks)} of {len(plan)} chunks failed ({failed})")
+                return None
+            return merger.result
+
+        except Exception as e:
+            logging.error(f"Error splitting audio: {str(e)}")
+            print(f"\nError splitting audio: {str(e)}")
+            return None
+
+class BatchRunner:
+    def __init__(self, processor: AudioProcessor, manifest_path: Path = BATCH_MANIFEST,
+                 workers: int = BATCH_WORKERS):
+        if isinstance(processor, AsyncAudioProcessor):
+            raise TypeError("BatchRunner runs files on threads and needs a sync AudioProcessor")
+        self.processor = processor
+        self.manifest_path = Path(manifest_path)
+        self.workers = max(1, workers)
+        self.journal_path = self.manifest_path.with_suffix(".journal.jsonl")
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+        self._journal = None
+
+    def _load_manifest(self) -> dict:
+        # The manifest is a snapshot written at the end of each run; updates made
+        # since then (e.g. by an interrupted run) are replayed from the journal
+        manifest = {"files": {}}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        if self.journal_path.exists():
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        fields = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by an interrupted run
+                    manifest["files"].setdefault(fields.pop("file"), {}).update(fields)
+        return manifest
+
+    def _save_manifest(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.manifest_path.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_path)
+
+    def _update(self, file_path: str, **fields):
+        # One appended line per update keeps the cost flat however many files there are
+        fields["updated"] = datetime.now().isoformat()
+        with self._lock:
+            self.manifest["files"].setdefault(file_path, {}).update(fields)
+            if self._journal is None:
+                self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(json.dumps({"file": file_path, **fields}, ensure_ascii=False) + "\n")
+            self._journal.flush()
+
+    def _compact(self):
+        # Fold the journal into the snapshot once the run is over
+        with self._lock:
+            self._save_manifest()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self.journal_path.unlink(missing_ok=True)
+
+    def iter_audio_files(self, directory: str) -> Iterator[str]:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().split('.')[-1] in SUPPORTED_FORMATS:
+                    yield os.path.abspath(os.path.join(root, name))
+
+    def _is_done(self, file_path: str) -> bool:
+        entry = self.manifest["files"].get(file_path, {})
+        return entry.get("status") == "done" and entry.get("mtime") == os.stat(file_path).st_mtime_ns
+
+    def _collect(self, done: set, pending: dict, stats: dict):
+        for future in done:
+            file_path = pending.pop(future)
+            try:
+                details = future.result()
+                stats["done"] += 1
+                stats["audio_minutes"] += details["duration_minutes"]
+                self._update(file_path, status="done", output=details["output_file"],
+                             cost_eur=round(details["cost_eur"], 4),
+                             duration_minutes=round(details["duration_minutes"], 2),
+                             cached=details["cached"], error=None)
+            except Exception as e:
+                stats["failed"] += 1
+                self.processor._record_failure(file_path, str(e))
+                self._update(file_path, status="failed", error=str(e))
+
+    def run(self, directory: str, task: str = "transcribe", language: Optional[str] = None,
+            output_format: str = "text") -> dict:
+        started = time.time()
+        stats = {"done": 0, "failed": 0, "skipped": 0, "audio_minutes": 0.0}
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for file_path in self.iter_audio_files(directory):
+                if self._is_done(file_path):
+                    stats["skipped"] += 1
+                    continue
+                self._update(file_path, status="pending", mtime=os.stat(file_path).st_mtime_ns)
+                future = executor.submit(self.processor._process_file, file_path, task,
+                                         language, False, output_format)
+                pending[future] = file_path
+                # Keep the walk only slightly ahead of the workers
+                if len(pending) >= self.workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    self._collect(done, pending, stats)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                self._collect(done, pending, stats)
+
+        elapsed_minutes = max((time.time() - started) / 60, 1e-6)
+        stats["elapsed_minutes"] = round(elapsed_minutes, 2)
+        stats["files_per_minute"] = round((stats["done"] + stats["failed"]) / elapsed_minutes, 2)
+        stats["audio_minutes_per_minute"] = round(stats["audio_minutes"] / elapsed_minutes, 2)
+        stats["audio_minutes"] = round(stats["audio_minutes"], 2)
+        self.manifest["last_run"] = {**stats, "directory": os.path.abspath(directory),
+                                     "finished": datetime.now().isoformat()}
+        self._compact()
+        return stats
+
+def print_batch_stats(stats: dict):
+    print("\nBatch Summary:")
+    print(f"Done: {stats['done']}  Failed: {stats['failed']}  Skipped: {stats['skipped']}")
+    print(f"Throughput: {stats['files_per_minute']} files/min, "
+          f"{stats['audio_minutes_per_minute']} audio-min/min")
+
 def main_menu():
     processor = AudioProcessor()
     
@@ -211,9 +1254,8 @@ def main_menu():
             elif choice == "3":
                 directory = input("\nEnter directory path: ")
                 task = input("Choose task (transcribe/translate): ")
-                for format in SUPPORTED_FORMATS:
-                    for file in Path(directory).glob(f"*.{format}"):
-                        processor.process_audio(str(file), task=task)
+                stats = BatchRunner(processor).run(directory, task=task)
+                print_batch_stats(stats)
                 
             elif choice == "4":
                 print("\nAdvanced Options:")
@@ -250,6 +1292,11 @@ def main_menu():
                 print("\nProcessing Summary:")
                 print(f"Total files processed: {summary['total_files_processed']}")
                 print(f"Total cost: €{summary['total_cost_eur']}")
+                print(f"Cache hits/misses: {summary['cache_hits']}/{summary['cache_misses']}")
+                print(f"Cost avoided by cache: €{summary['cost_avoided_eur']}")
+                print(f"Upload saved by re-encoding: {summary['upload_bytes_saved'] / (1024 * 1024):.1f}MB")
+                print(f"Silence removed: {summary['silence_minutes_removed']} minutes "
+                      f"(saved €{summary['silence_cost_avoided_eur']})")
                 if summary['failed_files']:
                     print("\nFailed files:")
                     for file, error in summary['failed_files']:
@@ -265,5 +1312,36 @@ def main_menu():
             
         input("\nPress Enter to continue...")
 
+def run_batch_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Speech-to-Text batch transcription")
+    parser.add_argument("--batch", metavar="DIR", help="Transcribe a directory non-interactively")
+    parser.add_argument("--task", choices=["transcribe", "translate"], default="transcribe")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="text")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--manifest", type=Path, default=BATCH_MANIFEST)
+    parser.add_argument("--transcode", choices=TRANSCODE_POLICIES, default="never",
+                        help="Re-encode to mono 16 kHz mp3 before upload")
+    parser.add_argument("--transcode-above-mb", type=float,
+                        default=TRANSCODE_ABOVE_BYTES / (1024 * 1024))
+    parser.add_argument("--trim-silence", action="store_true",
+                        help="Cut long silences before upload; timestamps keep the original timeline")
+    parser.add_argument("--chunk-overlap", type=float, default=CHUNK_OVERLAP_SECONDS,
+                        help="Seconds of audio shared by neighbouring chunks of a split file")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        main_menu()
+        return 0
+
+    processor = AudioProcessor(transcode_policy=args.transcode,
+                               transcode_above_bytes=int(args.transcode_above_mb * 1024 * 1024),
+                               trim_silence=args.trim_silence, chunk_overlap=args.chunk_overlap)
+    runner = BatchRunner(processor, args.manifest, args.workers)
+    stats = runner.run(args.batch, task=args.task, language=args.language,
+                       output_format=args.output_format)
+    print_batch_stats(stats)
+    return 1 if stats["failed"] else 0
+
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    raise SystemExit(run_batch_cli())
\ No newline at end of file
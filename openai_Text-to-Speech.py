@@ -8,15 +8,38 @@ from pathlib import Path
 from openai import OpenAI
 import time
 from tqdm import tqdm
+from pydub import AudioSegment
 import shutil
 import logging
+import re
+import io
+import json
+import hashlib
+import threading
+import queue
+import subprocess
+import csv
+import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Constants
 COST_PER_1K_CHARS = 0.015
 HD_COST_PER_1K_CHARS = 0.030
 EUR_RATE = 0.93
 SUPPORTED_LANGUAGES = ["en", "es", "fr", "de", "it", "pt", "pl", "tr"]
+MAX_INPUT_CHARS = 4096  # API limit per speech request
+MAX_CONCURRENT_SEGMENTS = 4
+SEGMENT_MAX_RETRIES = 3
+# Formats whose files can simply be appended byte-for-byte; the rest need re-muxing
+CONCATENABLE_FORMATS = ["mp3", "aac", "pcm"]
+STREAM_BUFFER_BYTES = 4096  # Smaller buffers reach the player sooner, larger ones cost fewer writes
+PCM_SAMPLE_RATE = 24000  # pcm output is raw 16-bit mono at 24 kHz
+CACHE_DIR = Path("cache") / "speech"
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used clips are evicted past this
+BATCH_WORKERS = 4
+BATCH_RPM = 50  # Requests per minute allowed across all batch workers
+BATCH_MANIFEST = Path("generated_audio") / "batch_results.jsonl"
 
 # Setup logging
 logging.basicConfig(
@@ -27,26 +50,243 @@ logging.basicConfig(
 
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+class SpeechCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cost_avoided = 0
+        self._lock = threading.Lock()
+
+    def _path(self, text, voice, model, output_format):
+        key = json.dumps([text, voice, model, output_format], ensure_ascii=False)
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.{output_format}"
+
+    def get(self, text, voice, model, output_format):
+        path = self._path(text, voice, model, output_format)
+        with self._lock:
+            try:
+                data = path.read_bytes()
+                os.utime(path)  # mtime doubles as the LRU clock
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.cost_avoided += calculate_cost(text, model)
+            return data
+
+    def put(self, text, voice, model, output_format, data=None, source_file=None):
+        path = self._path(text, voice, model, output_format)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        if source_file:
+            shutil.copyfile(source_file, temp_path)
+        else:
+            temp_path.write_bytes(data)
+        with self._lock:
+            os.replace(temp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = sorted((p for p in self.cache_dir.iterdir() if p.suffix != ".tmp"),
+                         key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
+    def stats(self):
+        return f"{self.hits} hits / {self.misses} misses, €{self.cost_avoided:.4f} avoided"
+
+speech_cache = SpeechCache()
+
+def calculate_cost(text, model="tts-1"):
+    is_hd = model == "tts-1-hd"
+    return (len(text) / 1000) * (HD_COST_PER_1K_CHARS if is_hd else COST_PER_1K_CHARS) * EUR_RATE
+
+def output_path(voice, model, output_format, language):
+    # Create output directory with language subfolder
+    output_dir = Path("generated_audio") / language / time.strftime("%Y%m%d")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Generate filename with metadata; exclusive create claims the name so
+    # concurrent or same-second runs never overwrite each other
+    timestamp = datetime.now().strftime("%H%M%S_%f")
+    for attempt in range(1000):
+        suffix = f"_{attempt}" if attempt else ""
+        path = output_dir / f"{voice}_{model}_{timestamp}{suffix}.{output_format}"
+        try:
+            with open(path, 'xb'):
+                return path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No free filename for {voice}_{model}_{timestamp} in {output_dir}")
+
+def split_text(text, limit=MAX_INPUT_CHARS):
+    # Break into paragraphs, then sentences, then words only where something is too long
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        paragraph = " ".join(paragraph.split())
+        if len(paragraph) <= limit:
+            units.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > limit:
+                cut = sentence.rfind(" ", 0, limit)
+                cut = cut if cut > 0 else limit
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if sentence:
+                units.append(sentence)
+
+    # Pack neighbouring units into as few requests as the limit allows
+    pieces = []
+    current = ""
+    for unit in units:
+        if current and len(current) + 1 + len(unit) > limit:
+            pieces.append(current)
+            current = unit
+        else:
+            current = f"{current} {unit}" if current else unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+class RateLimiter:
+    # Spaces calls evenly so all threads together stay under the per-minute budget
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute if per_minute else 0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+def synthesize_segment(text, voice, model, output_format, limiter=None):
+    # Synthesize one segment to bytes, from the cache when possible
+    cached = speech_cache.get(text, voice, model, output_format)
+    if cached is not None:
+        return cached
+    return request_segment(text, voice, model, output_format, limiter)
+
+def request_segment(text, voice, model, output_format, limiter=None):
+    # Call the API for one segment, retrying transient failures, and cache the result
+    for attempt in range(1, SEGMENT_MAX_RETRIES + 1):
+        try:
+            if limiter:
+                limiter.wait()
+            response = client.audio.speech.create(
+                model=model,
+                voice=voice,
+                input=text,
+                response_format=output_format
+            )
+            data = response.read()
+            speech_cache.put(text, voice, model, output_format, data)
+            return data
+        except Exception as e:
+            if attempt == SEGMENT_MAX_RETRIES:
+                raise
+            logging.warning(f"Segment attempt {attempt} failed: {str(e)}")
+            time.sleep(2 ** attempt)
+
+def join_audio(segments, output_format):
+    # Join synthesized segments in order into one file's worth of bytes
+    if output_format in CONCATENABLE_FORMATS:
+        return b"".join(segments)
+    combined = sum((AudioSegment.from_file(io.BytesIO(segment))
+                    for segment in segments), AudioSegment.empty())
+    buffer = io.BytesIO()
+    combined.export(buffer, format="ogg" if output_format == "opus" else output_format,
+                    codec="libopus" if output_format == "opus" else None)
+    return buffer.getvalue()
+
+def generate_long_speech(text, voice="alloy", model="tts-1", output_format="mp3", language="en",
+                         max_workers=MAX_CONCURRENT_SEGMENTS):
+    speech_file = None
+    partial_file = None
+    try:
+        segments = split_text(text)
+        costs = [calculate_cost(segment, model) for segment in segments]
+        avoided_before = speech_cache.cost_avoided
+        speech_file = output_path(voice, model, output_format, language)
+        # Segments are written to a side file that only replaces the claimed
+        # name once every segment is in, so a failure never leaves a truncated clip
+        partial_file = speech_file.with_name(speech_file.name + ".part")
+
+        print(f"\nGenerating long-form speech...")
+        print(f"Language: {language.upper()}")
+        print(f"Characters: {len(text):,} in {len(segments)} segments")
+        print(f"Estimated cost: €{sum(costs):.4f}")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                tqdm(total=len(segments), desc="Segments") as pbar:
+            futures = [executor.submit(synthesize_segment, segment, voice, model, output_format)
+                       for segment in segments]
+            if output_format in CONCATENABLE_FORMATS:
+                # Append each segment as soon as it and everything before it is done
+                with open(partial_file, 'wb') as f:
+                    for future in futures:
+                        f.write(future.result())
+                        pbar.update(1)
+            else:
+                audio = []
+                for future in futures:
+                    audio.append(future.result())
+                    pbar.update(1)
+                with open(partial_file, 'wb') as f:
+                    f.write(join_audio(audio, output_format))
+        os.replace(partial_file, speech_file)
+
+        for i, (segment, cost) in enumerate(zip(segments, costs), 1):
+            logging.info(f"Segment {i}/{len(segments)} of {speech_file.name}: "
+                         f"{len(segment):,} chars - Cost: €{cost:.4f}")
+        avoided = speech_cache.cost_avoided - avoided_before
+        logging.info(f"Generated: {speech_file.name} - Cost: €{sum(costs) - avoided:.4f} "
+                     f"- Cache avoided: €{avoided:.4f} ({speech_cache.stats()})")
+        print(f"\nAudio saved as: {speech_file}")
+        return speech_file
+
+    except Exception as e:
+        for path in (partial_file, speech_file):
+            if path:
+                path.unlink(missing_ok=True)
+        logging.error(f"Error generating long speech: {str(e)}")
+        print(f"Error: {str(e)}")
+        return None
+
 def generate_speech(text, voice="alloy", model="tts-1", output_format="mp3", language="en"):
+    if len(text) > MAX_INPUT_CHARS:
+        return generate_long_speech(text, voice, model, output_format, language)
+    speech_file = None
     try:
-        # Calculate cost
-        is_hd = model == "tts-1-hd"
-        cost = (len(text) / 1000) * (HD_COST_PER_1K_CHARS if is_hd else COST_PER_1K_CHARS) * EUR_RATE
-        
-        # Create output directory with language subfolder
-        output_dir = Path("generated_audio") / language / time.strftime("%Y%m%d")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate filename with metadata
-        timestamp = datetime.now().strftime("%H%M%S")
-        filename = f"{voice}_{model}_{timestamp}.{output_format}"
-        speech_file = output_dir / filename
+        cost = calculate_cost(text, model)
+        speech_file = output_path(voice, model, output_format, language)
+        filename = speech_file.name
         
         print(f"\nGenerating speech...")
         print(f"Language: {language.upper()}")
         print(f"Characters: {len(text):,}")
         print(f"Estimated cost: €{cost:.4f}")
         
+        cached = speech_cache.get(text, voice, model, output_format)
+        if cached is not None:
+            speech_file.write_bytes(cached)
+            print("Cache hit: no API call needed")
+            logging.info(f"Generated: {filename} - Cost: €0.0000 - Cache avoided: €{cost:.4f} "
+                         f"({speech_cache.stats()})")
+            print(f"\nAudio saved as: {speech_file}")
+            return speech_file
+
         # Stream and save with progress bar
         with tqdm(total=100, desc="Processing") as pbar:
             response = client.audio.speech.create(
@@ -60,25 +300,290 @@ def generate_speech(text, voice="alloy", model="tts-1", output_format="mp3", lan
                 for chunk in response.iter_bytes(chunk_size=1024):
                     f.write(chunk)
                     pbar.update(2)
+        speech_cache.put(text, voice, model, output_format, source_file=speech_file)
         
-        logging.info(f"Generated: {filename} - Cost: €{cost:.4f}")
+        logging.info(f"Generated: {filename} - Cost: €{cost:.4f} ({speech_cache.stats()})")
         print(f"\nAudio saved as: {speech_file}")
         return speech_file
         
     except Exception as e:
+        # Drop the name claimed by output_path so failures leave no empty files
+        if speech_file:
+            speech_file.unlink(missing_ok=True)
         logging.error(f"Error generating speech: {str(e)}")
         print(f"Error: {str(e)}")
         return None
 
+def open_player(output_format):
+    # ffplay reads from stdin, so playback can start on the first bytes received
+    if not shutil.which("ffplay"):
+        return None
+    command = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+    if output_format == "pcm":
+        command += ["-f", "s16le", "-ar", str(PCM_SAMPLE_RATE), "-ac", "1"]
+    command += ["-i", "-"]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+def start_sink(sink):
+    # Feed sink from its own thread so a consumer that only takes audio at playback
+    # speed (like ffplay's stdin) never slows down reading from the network.
+    # Put None on the returned queue to finish, then join the thread.
+    chunks = queue.Queue()
+
+    def feed():
+        failed = False
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            if failed:
+                continue  # Keep draining so the download is never blocked
+            try:
+                sink(chunk)
+            except Exception as e:
+                failed = True
+                logging.error(f"Audio sink stopped: {str(e)}")
+
+    thread = threading.Thread(target=feed, daemon=True)
+    thread.start()
+    return chunks, thread
+
+def stream_speech(text, voice="alloy", model="tts-1", output_format="pcm", language="en",
+                  sink=None, buffer_size=STREAM_BUFFER_BYTES):
+    # Hand audio to sink (a callable taking bytes) or a local player as it arrives,
+    # while also saving it; reports time-to-first-byte and total synthesis time,
+    # measured to the last byte received rather than the end of playback
+    if len(text) > MAX_INPUT_CHARS:
+        print("\nText is over the single-request limit - generating in segments instead")
+        return generate_long_speech(text, voice, model, output_format, language)
+    player = None
+    feeder = None
+    speech_file = None
+    try:
+        cost = calculate_cost(text, model)
+        speech_file = output_path(voice, model, output_format, language)
+        if sink is None:
+            player = open_player(output_format)
+            if player:
+                sink = player.stdin.write
+            else:
+                print("ffplay not found - saving without playback")
+
+        print(f"\nStreaming speech...")
+        print(f"Characters: {len(text):,}")
+        print(f"Estimated cost: €{cost:.4f}")
+
+        if sink:
+            feeder = start_sink(sink)
+
+        started = time.perf_counter()
+        first_byte = None
+        cached = speech_cache.get(text, voice, model, output_format)
+        with open(speech_file, 'wb') as f:
+            if cached is not None:
+                first_byte = time.perf_counter() - started
+                f.write(cached)
+                if feeder:
+                    feeder[0].put(cached)
+            else:
+                with client.audio.speech.with_streaming_response.create(
+                    model=model,
+                    voice=voice,
+                    input=text,
+                    response_format=output_format
+                ) as response:
+                    for chunk in response.iter_bytes(chunk_size=buffer_size):
+                        if first_byte is None:
+                            first_byte = time.perf_counter() - started
+                        f.write(chunk)
+                        if feeder:
+                            feeder[0].put(chunk)
+                speech_cache.put(text, voice, model, output_format, source_file=speech_file)
+        # The last network byte has arrived; playback may still be running
+        total = time.perf_counter() - started
+
+        print(f"Time to first audio: {(first_byte or total) * 1000:.0f} ms")
+        print(f"Total synthesis time: {total:.2f} s")
+        logging.info(f"Streamed: {speech_file.name} - TTFB: {(first_byte or total) * 1000:.0f} ms "
+                     f"- Total: {total:.2f} s - Cost: €{0 if cached is not None else cost:.4f} "
+                     f"({speech_cache.stats()})")
+        return speech_file
+
+    except Exception as e:
+        if speech_file:
+            speech_file.unlink(missing_ok=True)
+        logging.error(f"Error streaming speech: {str(e)}")
+        print(f"Error: {str(e)}")
+        return None
+    finally:
+        if feeder:
+            feeder[0].put(None)
+            feeder[1].join()
+        if player:
+            player.stdin.close()
+            player.wait()
+
+PREVIEW_TEXT = "This is a preview of my voice."
+
+def play_audio(data, output_format, voice, model="tts-1", language="en"):
+    # Play bytes through ffplay's stdin, or save them and fall back to afplay
+    player = open_player(output_format)
+    if player:
+        try:
+            player.stdin.write(data)
+        finally:
+            player.stdin.close()
+            player.wait()
+        return
+    audio_file = output_path(voice, model, output_format, language)
+    audio_file.write_bytes(data)
+    os.system(f"afplay {audio_file}")
+
 def preview_voice(voice, language="en"):
-    sample_text = "This is a preview of my voice."
-    preview_file = generate_speech(
-        text=sample_text,
-        voice=voice,
-        language=language
-    )
-    if preview_file:
-        os.system(f"afplay {preview_file}")
+    preview_voices([voice], language)
+
+def preview_voices(voices, language="en", output_format="mp3"):
+    # Synthesize every preview at once, then play them back-to-back in order;
+    # playback of the first starts while the rest are still being generated
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(voices)) as executor:
+        futures = [executor.submit(synthesize_segment, PREVIEW_TEXT, voice, "tts-1", output_format)
+                   for voice in voices]
+        for voice, future in zip(voices, futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                logging.error(f"Error previewing {voice}: {str(e)}")
+                print(f"Error previewing {voice}: {str(e)}")
+                continue
+            print(f"\nPreviewing {voice}... (ready after {time.perf_counter() - started:.2f} s)")
+            play_audio(data, output_format, voice, language=language)
+    logging.info(f"Previewed {len(voices)} voices in {time.perf_counter() - started:.2f} s "
+                 f"({speech_cache.stats()})")
+
+def iter_batch_rows(path):
+    # Yield (row number, row) one at a time so huge job files never sit in memory;
+    # a malformed JSONL line is yielded as its ValueError instead of ending the run
+    with open(path, newline='', encoding='utf-8') as f:
+        if Path(path).suffix.lower() == ".csv":
+            for number, row in enumerate(csv.DictReader(f), 1):
+                yield number, row
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = ValueError(f"invalid JSON: {e}")
+                yield number, row
+
+def synthesize_row(row, defaults, limiter):
+    # Synthesize one batch row to its own file and describe the outcome
+    started = time.perf_counter()
+    text = (row.get("text") or "").strip()
+    voice = row.get("voice") or defaults["voice"]
+    model = row.get("model") or defaults["model"]
+    output_format = row.get("format") or defaults["format"]
+    language = row.get("language") or defaults["language"]
+    if not text:
+        raise ValueError("row has no text")
+
+    segments = split_text(text)
+    audio = []
+    cost = 0
+    cached_segments = 0
+    for segment in segments:
+        data = speech_cache.get(segment, voice, model, output_format)
+        if data is None:
+            data = request_segment(segment, voice, model, output_format, limiter)
+            cost += calculate_cost(segment, model)
+        else:
+            cached_segments += 1
+        audio.append(data)
+
+    # Claim the output name only once the audio is ready
+    data = audio[0] if len(audio) == 1 else join_audio(audio, output_format)
+    speech_file = output_path(voice, model, output_format, language)
+    speech_file.write_bytes(data)
+    return {
+        "file": str(speech_file),
+        "voice": voice,
+        "model": model,
+        "format": output_format,
+        "language": language,
+        "characters": len(text),
+        "segments": len(segments),
+        "cached_segments": cached_segments,
+        "cost_eur": round(cost, 6),
+        "latency_s": round(time.perf_counter() - started, 3)
+    }
+
+def run_batch(job_file, manifest_path=BATCH_MANIFEST, workers=BATCH_WORKERS, rpm=BATCH_RPM,
+              defaults=None):
+    # Each finished row is appended to the manifest straight away, so the
+    # results of a long run survive an interruption
+    defaults = {"voice": "alloy", "model": "tts-1", "format": "mp3", "language": "en",
+                **(defaults or {})}
+    limiter = RateLimiter(rpm)
+    workers = max(1, workers)
+    stats = {"done": 0, "failed": 0, "cost_eur": 0, "latency_s": 0}
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+
+    def record(entry, manifest, pbar):
+        manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        manifest.flush()
+        pbar.update(1)
+
+    def record_failure(number, error, manifest, pbar):
+        stats["failed"] += 1
+        logging.error(f"Batch row {number} failed: {str(error)}")
+        record({"row": number, "status": "failed", "error": str(error)}, manifest, pbar)
+
+    def collect(done, pending, manifest, pbar):
+        for future in done:
+            number = pending.pop(future)
+            try:
+                entry = {"row": number, **future.result(), "status": "done"}
+            except Exception as e:
+                record_failure(number, e, manifest, pbar)
+                continue
+            stats["done"] += 1
+            stats["cost_eur"] += entry["cost_eur"]
+            stats["latency_s"] += entry["latency_s"]
+            record(entry, manifest, pbar)
+
+    pending = {}
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            ThreadPoolExecutor(max_workers=workers) as executor, \
+            tqdm(desc="Rows", unit="row") as pbar:
+        try:
+            for number, row in iter_batch_rows(job_file):
+                if isinstance(row, ValueError):
+                    record_failure(number, row, manifest, pbar)
+                    continue
+                future = executor.submit(synthesize_row, row, defaults, limiter)
+                pending[future] = number
+                # Read only slightly ahead of the workers
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done, pending, manifest, pbar)
+        finally:
+            # Rows already submitted still reach the manifest if reading the job file fails
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done, pending, manifest, pbar)
+
+    elapsed_minutes = max((time.time() - started) / 60, 1e-6)
+    finished = stats["done"] + stats["failed"]
+    stats["rows_per_minute"] = round(finished / elapsed_minutes, 2)
+    stats["avg_latency_s"] = round(stats["latency_s"] / stats["done"], 3) if stats["done"] else 0
+    logging.info(f"Batch {job_file}: {stats['done']} done, {stats['failed']} failed - "
+                 f"{stats['rows_per_minute']} rows/min - Cost: €{stats['cost_eur']:.4f} "
+                 f"({speech_cache.stats()})")
+    return stats
 
 def main_menu():
     voices = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
@@ -94,9 +599,10 @@ def main_menu():
         print("4. Change Format")
         print("5. Change Language")
         print("6. Preview Voices")
-        print("7. Exit")
+        print("7. Stream Speech (Low Latency)")
+        print("8. Exit")
         
-        choice = input("\nChoice (1-7): ")
+        choice = input("\nChoice (1-8): ")
         
         if choice in ["1", "2"]:
             text = input("\nEnter text: ")
@@ -138,16 +644,54 @@ def main_menu():
         
         elif choice == "6":
             print("\nPreviewing voices...")
-            for voice in voices:
-                print(f"\nPreviewing {voice}...")
-                preview_voice(voice, current_language)
-                time.sleep(1)
+            preview_voices(voices, current_language)
+            print(f"\nCache: {speech_cache.stats()}")
         
         elif choice == "7":
+            text = input("\nEnter text: ")
+            # pcm and opus start playing soonest; other formats stream too
+            stream_speech(
+                text,
+                voice=voices[0],
+                output_format=formats[0],
+                language=current_language
+            )
+        
+        elif choice == "8":
             print("\nGoodbye!")
             break
         
         input("\nPress Enter to continue...")
 
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Text-to-Speech generator")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Synthesize every row of a JSONL or CSV file non-interactively")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--rpm", type=int, default=BATCH_RPM,
+                        help="API requests per minute across all workers (0 = unlimited)")
+    parser.add_argument("--manifest", type=Path, default=BATCH_MANIFEST,
+                        help="JSONL file the per-row results are appended to")
+    parser.add_argument("--voice", default="alloy", help="Used when a row has no voice")
+    parser.add_argument("--model", default="tts-1", help="Used when a row has no model")
+    parser.add_argument("--format", default="mp3", help="Used when a row has no format")
+    parser.add_argument("--language", default="en", help="Used when a row has no language")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        main_menu()
+        return 0
+
+    stats = run_batch(args.batch, args.manifest, args.workers, args.rpm,
+                      defaults={"voice": args.voice, "model": args.model,
+                                "format": args.format, "language": args.language})
+    print("\nBatch Summary:")
+    print(f"Done: {stats['done']}  Failed: {stats['failed']}")
+    print(f"Throughput: {stats['rows_per_minute']} rows/min, "
+          f"average latency {stats['avg_latency_s']} s")
+    print(f"Cost: €{stats['cost_eur']:.4f}  Cache: {speech_cache.stats()}")
+    print(f"Results: {args.manifest}")
+    return 1 if stats["failed"] else 0
+
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    raise SystemExit(run_cli())
\ No newline at end of file
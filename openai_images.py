@@ -4,32 +4,136 @@
 
 # Import the required modules
 import os
-from openai import OpenAI
+from openai import OpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from PIL import Image
 import io
+import re
+import csv
+import json
+import time
+import base64
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+IMAGE_DIR = "images"
+DOWNLOAD_TIMEOUT = (10, 60)  # (connect, read) seconds
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+B64_CHUNK_CHARS = 64 * 1024  # A multiple of 4, so every slice decodes on its own
+RESPONSE_FORMATS = ["url", "b64_json"]  # b64_json returns the image inline, skipping the download
+BATCH_WORKERS = 4
+SAVE_WORKERS = 4  # Downloads and saves run beside generation, not after it
+BATCH_MAX_RETRIES = 5
+# Images per minute per model; check your account tier and override with --limit
+IMAGES_PER_MINUTE = {
+    "dall-e-3": 7,
+    "dall-e-2": 50
+}
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024  # DALL-E 2 rejects larger image and mask uploads
+PREPARED_CACHE_DIR = os.path.join("cache", "prepared_images")
+PREPARED_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used inputs are evicted past this
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp"
+}
 
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+prepared_cache_lock = threading.Lock()
+
+# One keep-alive session so repeat downloads reuse their TLS connection
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 def clear_screen():
     os.system('clear')
 
-def save_image(url, prefix):
-    """Save image from URL with timestamp"""
+def unique_filename(prefix, extension):
+    """Claim a new file in the images folder that no other save can reuse"""
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    for attempt in range(1000):
+        suffix = f"_{attempt}" if attempt else ""
+        filename = f"{IMAGE_DIR}/{prefix}_{timestamp}{suffix}.{extension}"
+        try:
+            with open(filename, "xb"):
+                return filename
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No free filename for {prefix}_{timestamp}")
+
+def save_image(url, prefix, output_format=None):
+    """Stream image from URL to disk, converting only if output_format asks for it"""
+    filename = None
     try:
-        response = requests.get(url)
-        img = Image.open(io.BytesIO(response.content))
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"images/{prefix}_{timestamp}.png"
-        os.makedirs("images", exist_ok=True)
-        img.save(filename)
-        return filename
+        with session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+            extension = CONTENT_TYPE_EXTENSIONS.get(content_type, "png")
+            filename = unique_filename(prefix, extension)
+            with open(filename, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+        return convert_image(filename, prefix, output_format)
     except Exception as e:
         print(f"Error saving image: {e}")
+        if filename and os.path.exists(filename):
+            os.remove(filename)
         return None
 
-def generate_image():
+def sniff_extension(header):
+    """Pick a file extension from an image's first bytes"""
+    if header.startswith(b"\xff\xd8"):
+        return "jpg"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return "png"
+
+def save_b64_image(b64_data, prefix, output_format=None):
+    """Decode an inline base64 image to disk slice by slice"""
+    filename = None
+    try:
+        header = base64.b64decode(b64_data[:16])
+        filename = unique_filename(prefix, sniff_extension(header))
+        with open(filename, "wb") as f:
+            for start in range(0, len(b64_data), B64_CHUNK_CHARS):
+                f.write(base64.b64decode(b64_data[start:start + B64_CHUNK_CHARS]))
+        return convert_image(filename, prefix, output_format)
+    except Exception as e:
+        print(f"Error saving image: {e}")
+        if filename and os.path.exists(filename):
+            os.remove(filename)
+        return None
+
+def save_result(image, prefix, response_format="url"):
+    """Save one item of an images API response, whichever format it came back in"""
+    if response_format == "b64_json":
+        return save_b64_image(image.b64_json, prefix)
+    return save_image(image.url, prefix)
+
+def convert_image(filename, prefix, output_format=None):
+    """Re-encode a saved image only when a different format was asked for"""
+    extension = filename.rsplit(".", 1)[-1]
+    target = (output_format or extension).lower().replace("jpeg", "jpg")
+    if target == extension:
+        return filename
+    converted = unique_filename(prefix, target)
+    try:
+        with Image.open(filename) as img:
+            if target == "jpg":
+                img = img.convert("RGB")
+            img.save(converted)
+    except Exception:
+        os.remove(converted)
+        raise
+    os.remove(filename)
+    return converted
+
+def generate_image(response_format="url"):
     """Generate image using DALL-E 3"""
     try:
         prompt = input("\nEnter your image prompt: ")
@@ -47,10 +151,10 @@ def generate_image():
             size=size_map.get(size, "1024x1024"),
             quality="standard",
             n=1,
+            response_format=response_format
         )
         
-        image_url = response.data[0].url
-        filename = save_image(image_url, "dalle3")
+        filename = save_result(response.data[0], "dalle3", response_format)
         
         if filename:
             print(f"\nImage saved as: {filename}")
@@ -59,66 +163,356 @@ def generate_image():
     except Exception as e:
         print(f"Error generating image: {e}")
 
-def edit_image():
+def prepare_image(path, size="1024x1024", mask=False):
+    """Validate an edit/variation input and return it as upload-ready RGBA PNG bytes"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    key = hashlib.sha256(raw + f"|{size}|{'mask' if mask else 'image'}".encode()).hexdigest()
+    cached = os.path.join(PREPARED_CACHE_DIR, f"{key}.png")
+    with prepared_cache_lock:
+        try:
+            with open(cached, "rb") as f:
+                data = f.read()
+            os.utime(cached)  # mtime doubles as the LRU clock
+            return data
+        except OSError:
+            pass
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+    except Exception as e:
+        raise ValueError(f"{path} is not a readable image: {e}")
+    if img.width != img.height:
+        raise ValueError(f"{path} must be square, got {img.width}x{img.height}")
+    img = img.convert("RGBA")
+    target = int(size.split("x")[0])
+    if img.width > target:
+        img = img.resize((target, target), Image.LANCZOS)
+    if mask and img.getchannel("A").getextrema()[0] == 255:
+        raise ValueError(f"{path} has no transparent area to mark what should be edited")
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    data = buffer.getvalue()
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(f"{path} is {len(data) / 1024 / 1024:.1f} MB as PNG; the limit is "
+                         f"{MAX_UPLOAD_BYTES // 1024 // 1024} MB")
+
+    os.makedirs(PREPARED_CACHE_DIR, exist_ok=True)
+    temp_file = f"{cached}.{threading.get_ident()}.tmp"
+    with open(temp_file, "wb") as f:
+        f.write(data)
+    with prepared_cache_lock:
+        os.replace(temp_file, cached)
+        evict_prepared_images()
+    return data
+
+def evict_prepared_images(max_bytes=PREPARED_CACHE_MAX_BYTES):
+    """Delete the least recently used prepared inputs until the cache fits in max_bytes"""
+    entries = sorted((os.path.join(PREPARED_CACHE_DIR, name) for name in os.listdir(PREPARED_CACHE_DIR)
+                      if name.endswith(".png")), key=os.path.getmtime)
+    total = sum(os.path.getsize(path) for path in entries)
+    for path in entries:
+        if total <= max_bytes:
+            break
+        total -= os.path.getsize(path)
+        os.remove(path)
+
+def prepare_edit(image_path, mask_path=None, size="1024x1024"):
+    """Prepare an image and optional mask, checking they line up; returns upload tuples"""
+    image = prepare_image(image_path, size)
+    if not mask_path:
+        return ("image.png", image, "image/png"), None
+    mask = prepare_image(mask_path, size, mask=True)
+    with Image.open(io.BytesIO(image)) as img, Image.open(io.BytesIO(mask)) as msk:
+        if img.size != msk.size:
+            raise ValueError(f"Mask is {msk.width}x{msk.height} but image is {img.width}x{img.height}")
+    return ("image.png", image, "image/png"), ("mask.png", mask, "image/png")
+
+def edit_image(response_format="url"):
     """Edit image using DALL-E 2"""
     try:
         image_path = input("\nEnter path to image to edit (PNG format): ")
         mask_path = input("Enter path to mask image (PNG format): ")
         prompt = input("Enter prompt for editing: ")
+        image, mask = prepare_edit(image_path, mask_path, "1024x1024")
         
         response = client.images.edit(
             model="dall-e-2",
-            image=open(image_path, "rb"),
-            mask=open(mask_path, "rb"),
+            image=image,
             prompt=prompt,
             n=1,
-            size="1024x1024"
+            size="1024x1024",
+            response_format=response_format,
+            **({"mask": mask} if mask else {})
         )
         
-        filename = save_image(response.data[0].url, "dalle2_edit")
+        filename = save_result(response.data[0], "dalle2_edit", response_format)
         if filename:
             print(f"\nEdited image saved as: {filename}")
             
     except Exception as e:
         print(f"Error editing image: {e}")
 
-def create_variation():
+def create_variation(response_format="url"):
     """Create variation using DALL-E 2"""
     try:
         image_path = input("\nEnter path to image for variation (PNG format): ")
+        image, _ = prepare_edit(image_path, size="1024x1024")
         
         response = client.images.create_variation(
             model="dall-e-2",
-            image=open(image_path, "rb"),
+            image=image,
             n=1,
-            size="1024x1024"
+            size="1024x1024",
+            response_format=response_format
         )
         
-        filename = save_image(response.data[0].url, "dalle2_variation")
+        filename = save_result(response.data[0], "dalle2_variation", response_format)
         if filename:
             print(f"\nVariation saved as: {filename}")
             
     except Exception as e:
         print(f"Error creating variation: {e}")
 
+class RateLimiter:
+    """Spaces requests evenly across threads and holds them all after a 429"""
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute if per_minute else 0
+        self.next_slot = time.monotonic()
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.throttled += 1
+            self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+def retry_delay(error, attempt):
+    """Seconds to wait after a 429, preferring what the response headers say"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    # Reset headers look like "1m30s", "6.5s" or "20ms"
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset-images")
+    if reset:
+        units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        seconds = sum(float(value) * units[unit]
+                      for value, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", reset))
+        if seconds:
+            return seconds
+    return min(2 ** attempt, 60)
+
+def iter_batch_rows(path):
+    """Yield (row number, row) from a JSONL or CSV job file one at a time.
+
+    A malformed JSONL line, or one that is not an object, is yielded as a ValueError
+    so only that row fails.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith(".csv"):
+            for number, row in enumerate(csv.DictReader(f), 1):
+                yield number, row
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = ValueError(f"invalid JSON: {e}")
+                if not isinstance(row, (dict, ValueError)):
+                    row = ValueError(f"expected a JSON object, got {type(row).__name__}")
+                yield number, row
+
+def resolve_job(row):
+    """Fill in defaults for a batch row"""
+    action = row.get("action") or "generate"
+    if action not in ("generate", "edit", "variation"):
+        raise ValueError(f"unknown action: {action}")
+    model = row.get("model") or ("dall-e-3" if action == "generate" else "dall-e-2")
+    prefix = model.replace("-", "") if action == "generate" else f"{model.replace('-', '')}_{action}"
+    return {
+        "action": action,
+        "model": model,
+        "prompt": row.get("prompt"),
+        "size": row.get("size") or "1024x1024",
+        "quality": row.get("quality") or "standard",
+        "image": row.get("image"),
+        "mask": row.get("mask"),
+        "prefix": prefix
+    }
+
+def run_image_job(job, limiter, response_format="url"):
+    """Make one images API call under the model's limiter; returns (image, seconds)"""
+    # Retries are ours, so the limiter sees every 429; timeouts, dropped
+    # connections and 5xx errors are retried with backoff below
+    batch_client = client.with_options(max_retries=0)
+    # Bad inputs fail here, before they use up a rate-limit slot
+    uploads = {}
+    if job["action"] == "edit":
+        image, mask = prepare_edit(job["image"], job["mask"], job["size"])
+        uploads = {"image": image, **({"mask": mask} if mask else {})}
+    elif job["action"] == "variation":
+        uploads = {"image": prepare_edit(job["image"], size=job["size"])[0]}
+    for attempt in range(1, BATCH_MAX_RETRIES + 1):
+        limiter.wait()
+        started = time.perf_counter()
+        try:
+            if job["action"] == "generate":
+                response = batch_client.images.generate(
+                    model=job["model"],
+                    prompt=job["prompt"],
+                    size=job["size"],
+                    quality=job["quality"],
+                    n=1,
+                    response_format=response_format
+                )
+            elif job["action"] == "edit":
+                response = batch_client.images.edit(
+                    model=job["model"],
+                    prompt=job["prompt"],
+                    n=1,
+                    size=job["size"],
+                    response_format=response_format,
+                    **uploads
+                )
+            else:
+                response = batch_client.images.create_variation(
+                    model=job["model"],
+                    n=1,
+                    size=job["size"],
+                    response_format=response_format,
+                    **uploads
+                )
+            return response.data[0], time.perf_counter() - started
+        except RateLimitError as e:
+            if attempt == BATCH_MAX_RETRIES:
+                raise
+            limiter.pause(retry_delay(e, attempt))
+        except (APIConnectionError, APITimeoutError, InternalServerError):
+            # Transient failures the SDK would have retried; only this row waits
+            if attempt == BATCH_MAX_RETRIES:
+                raise
+            time.sleep(min(2 ** attempt, 60))
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def run_image_batch(job_file, workers=BATCH_WORKERS, limits=None, response_format="url"):
+    """Run every row of a job file through the scheduler and return throughput stats"""
+    limits = {**IMAGES_PER_MINUTE, **(limits or {})}
+    limiters = {}
+    latencies = []
+    stats = {"images": 0, "failed": 0}
+    generating = {}
+    saving = {}
+    started = time.time()
+
+    def collect_saves(done):
+        for future in done:
+            number = saving.pop(future)
+            if future.result():
+                stats["images"] += 1
+            else:
+                stats["failed"] += 1
+                print(f"Row {number}: image could not be saved")
+
+    def collect_generations(done, save_pool):
+        for future in done:
+            number, job = generating.pop(future)
+            try:
+                image, latency = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"Row {number}: {e}")
+                continue
+            latencies.append(latency)
+            saving[save_pool.submit(save_result, image, job["prefix"], response_format)] = number
+        # Don't let finished images pile up faster than they can be saved
+        while len(saving) > SAVE_WORKERS * 4:
+            done, _ = wait(saving, return_when=FIRST_COMPLETED)
+            collect_saves(done)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as generate_pool, \
+            ThreadPoolExecutor(max_workers=SAVE_WORKERS) as save_pool:
+        try:
+            for number, row in iter_batch_rows(job_file):
+                try:
+                    if isinstance(row, ValueError):
+                        raise row
+                    job = resolve_job(row)
+                except ValueError as e:
+                    stats["failed"] += 1
+                    print(f"Row {number}: {e}")
+                    continue
+                if job["model"] not in limiters:
+                    limiters[job["model"]] = RateLimiter(limits.get(job["model"]))
+                future = generate_pool.submit(run_image_job, job, limiters[job["model"]],
+                                              response_format)
+                generating[future] = (number, job)
+                # Keep the pool full without reading the whole file ahead
+                if len(generating) >= max(1, workers) * 2:
+                    done, _ = wait(generating, return_when=FIRST_COMPLETED)
+                    collect_generations(done, save_pool)
+                    collect_saves([f for f in list(saving) if f.done()])
+        finally:
+            # Images already requested are still saved if reading the job file fails
+            while generating:
+                done, _ = wait(generating, return_when=FIRST_COMPLETED)
+                collect_generations(done, save_pool)
+            collect_saves(list(saving))
+
+    elapsed_minutes = max((time.time() - started) / 60, 1e-6)
+    return {
+        **stats,
+        "throttled": sum(limiter.throttled for limiter in limiters.values()),
+        "elapsed_minutes": round(elapsed_minutes, 2),
+        "images_per_minute": round(stats["images"] / elapsed_minutes, 2),
+        "p50_latency_s": round(percentile(latencies, 0.50), 2),
+        "p95_latency_s": round(percentile(latencies, 0.95), 2)
+    }
+
 def main_menu():
+    response_format = "url"
     while True:
         clear_screen()
         print("\nDALL-E Image Generator")
         print("1. Generate New Image (DALL-E 3)")
         print("2. Edit Image (DALL-E 2)")
         print("3. Create Variation (DALL-E 2)")
-        print("4. Exit")
+        print(f"4. Toggle Response Format (current: {response_format})")
+        print("5. Exit")
         
-        choice = input("\nEnter your choice (1-4): ")
+        choice = input("\nEnter your choice (1-5): ")
         
         if choice == "1":
-            generate_image()
+            generate_image(response_format)
         elif choice == "2":
-            edit_image()
+            edit_image(response_format)
         elif choice == "3":
-            create_variation()
+            create_variation(response_format)
         elif choice == "4":
+            response_format = RESPONSE_FORMATS[1 - RESPONSE_FORMATS.index(response_format)]
+            print(f"\nResponse format set to: {response_format}")
+        elif choice == "5":
             print("\nGoodbye!")
             break
         else:
@@ -126,5 +520,30 @@ def main_menu():
         
         input("\nPress Enter to continue...")
 
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="DALL-E image generator")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Run a JSONL or CSV file of image jobs non-interactively")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--response-format", choices=RESPONSE_FORMATS, default="url")
+    parser.add_argument("--limit", action="append", default=[], metavar="MODEL=N",
+                        help="Images per minute for a model, e.g. dall-e-3=15 (repeatable)")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        main_menu()
+        return 0
+
+    limits = {}
+    for limit in args.limit:
+        model, _, per_minute = limit.partition("=")
+        limits[model] = float(per_minute)
+    stats = run_image_batch(args.batch, args.workers, limits, args.response_format)
+    print("\nBatch Summary:")
+    print(f"Images: {stats['images']}  Failed: {stats['failed']}  Throttled (429): {stats['throttled']}")
+    print(f"Throughput: {stats['images_per_minute']} images/min over {stats['elapsed_minutes']} min")
+    print(f"Generation latency: p50 {stats['p50_latency_s']} s, p95 {stats['p95_latency_s']} s")
+    return 1 if stats["failed"] else 0
+
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    raise SystemExit(run_cli())
\ No newline at end of file
@@ -11,9 +11,10 @@ from PIL import Image
 import requests
 from datetime import datetime
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import json
 from pydub import AudioSegment
+from openai_vision import prepare_image, calculate_image_cost, parse_packed_answers, PACK_INSTRUCTION
 
 # API Cost Constants (USD)
 COSTS = {
@@ -38,9 +39,8 @@ COSTS = {
         'hd': 0.030
     },
     'vision': {
-        'input': 0.01,
-        'output': 0.03,
-        'image': 0.085
+        'input': 0.01,    # Per 1K tokens, image tokens included
+        'output': 0.03
     }
 }
 
@@ -80,14 +80,15 @@ class APITester:
             'cost_eur': cost
         }
 
-    def test_image(self, prompt: str, quality: str = "standard") -> Dict:
+    def test_image(self, prompt: str, quality: str = "standard", response_format: str = "url") -> Dict:
         """Test DALL-E image generation"""
         start = time.time()
         response = self.client.images.generate(
             model="dall-e-3",
             prompt=prompt,
             quality=quality,
-            n=1
+            n=1,
+            response_format=response_format
         )
         
         duration = time.time() - start
@@ -96,16 +97,49 @@ class APITester:
         self.costs['total'] += cost
         self.costs['dalle-3'] = self.costs.get('dalle-3', 0) + cost
         
-        return {
-            'url': response.data[0].url,
+        result = {
             'duration': duration,
             'cost_eur': cost
         }
+        if response_format == "b64_json":
+            # Inline payload: decode straight to disk, no second download
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            result['file'] = self.save_b64(response.data[0].b64_json, f"output/images/dalle3_{timestamp}.png")
+        else:
+            result['url'] = response.data[0].url
+        return result
 
-    def test_vision(self, image_path: str, prompt: str) -> Dict:
-        """Test GPT-4 Vision analysis"""
+    def save_b64(self, b64_data: str, output_file: str, chunk_chars: int = 64 * 1024) -> str:
+        """Decode base64 to a file in slices (chunk_chars must be a multiple of 4)"""
+        with open(output_file, "wb") as f:
+            for start in range(0, len(b64_data), chunk_chars):
+                f.write(base64.b64decode(b64_data[start:start + chunk_chars]))
+        return output_file
+
+    def prepare_vision_image(self, image_path: str, detail: str = "auto") -> Dict:
+        """Downscale an image to its detail tier and re-encode it for upload"""
         with open(image_path, "rb") as img_file:
-            base64_image = base64.b64encode(img_file.read()).decode('utf-8')
+            raw = img_file.read()
+        data, mime, original_size, size = prepare_image(raw, detail)
+        return {
+            'data': data,
+            'mime': mime,
+            'original_size': original_size,
+            'size': size,
+            'bytes_saved': len(raw) - len(data),
+            'tokens_saved': calculate_image_cost(original_size, detail)[0]
+                            - calculate_image_cost(size, detail)[0]
+        }
+
+    def vision_cost(self, usage) -> float:
+        """Token-priced cost of one vision request"""
+        return ((usage.prompt_tokens / 1000) * COSTS['vision']['input']
+                + (usage.completion_tokens / 1000) * COSTS['vision']['output']) * EUR_RATE
+
+    def test_vision(self, image_path: str, prompt: str, detail: str = "auto") -> Dict:
+        """Test GPT-4 Vision analysis"""
+        image = self.prepare_vision_image(image_path, detail)
+        base64_image = base64.b64encode(image['data']).decode('utf-8')
             
         start = time.time()
         response = self.client.chat.completions.create(
@@ -114,13 +148,14 @@ class APITester:
                 "role": "user",
                 "content": [
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+                    {"type": "image_url", "image_url": {"url": f"data:{image['mime']};base64,{base64_image}",
+                                                        "detail": detail}}
                 ]
             }]
         )
         
         duration = time.time() - start
-        cost = COSTS['vision']['image'] * EUR_RATE
+        cost = self.vision_cost(response.usage)
         
         self.costs['total'] += cost
         self.costs['vision'] = self.costs.get('vision', 0) + cost
@@ -128,9 +163,64 @@ class APITester:
         return {
             'response': response.choices[0].message.content,
             'duration': duration,
-            'cost_eur': cost
+            'cost_eur': cost,
+            'mime': image['mime'],
+            'size': image['size'],
+            'bytes_saved': image['bytes_saved'],
+            'tokens_saved': image['tokens_saved']
         }
 
+    def test_vision_packed(self, image_paths: List[str], prompt: str, detail: str = "auto") -> List[Dict]:
+        """Test several images in one GPT-4 Vision request, split back per image"""
+        images = [self.prepare_vision_image(path, detail) for path in image_paths]
+        content = [{"type": "text", "text": f"{prompt}\n\n{PACK_INSTRUCTION.format(count=len(images))}"}]
+        for i, image in enumerate(images, 1):
+            base64_image = base64.b64encode(image['data']).decode('utf-8')
+            content += [
+                {"type": "text", "text": f"Image {i}:"},
+                {"type": "image_url", "image_url": {"url": f"data:{image['mime']};base64,{base64_image}",
+                                                    "detail": detail}}
+            ]
+
+        start = time.time()
+        response = self.client.chat.completions.create(
+            model="gpt-4-vision-preview",
+            messages=[{"role": "user", "content": content}],
+            max_tokens=300 * len(images)
+        )
+        duration = time.time() - start
+        usage = response.usage
+        cost = self.vision_cost(usage)
+        self.costs['total'] += cost
+        self.costs['vision'] = self.costs.get('vision', 0) + cost
+
+        try:
+            # This model has no JSON mode, so allow for prose or code fences around the object
+            text = response.choices[0].message.content
+            answers = parse_packed_answers(text[text.index('{'):text.rindex('}') + 1], len(images))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Packed reply could not be split ({e}) - testing each image separately")
+            results = [self.test_vision(path, prompt, detail) for path in image_paths]
+            # The unusable packed request was billed too, so each image carries a share of it
+            for result in results:
+                result['cost_eur'] += cost / len(images)
+            return results
+
+        # Each image pays for its own estimated image tokens plus an even share of the rest
+        image_tokens = [calculate_image_cost(image['size'], detail)[0] for image in images]
+        shared_tokens = max(0, usage.total_tokens - sum(image_tokens)) / len(images)
+        per_token = cost / (sum(image_tokens) + shared_tokens * len(images) or 1)
+        return [{
+            'response': answer,
+            'duration': duration,
+            'cost_eur': (tokens + shared_tokens) * per_token,
+            'mime': image['mime'],
+            'size': image['size'],
+            'bytes_saved': image['bytes_saved'],
+            'tokens_saved': image['tokens_saved'],
+            'packed': len(images)
+        } for answer, image, tokens in zip(answers, images, image_tokens)]
+
     def test_speech_to_text(self, audio_path: str, task: str = "transcribe") -> Dict:
         """Test Whisper speech-to-text"""
         audio = AudioSegment.from_file(audio_path)
@@ -215,16 +305,29 @@ def main_menu():
             elif choice == "2":
                 prompt = input("Enter image prompt: ")
                 quality = input("Quality (standard/hd): ")
-                result = tester.test_image(prompt, quality)
-                print(f"\nImage URL: {result['url']}")
+                response_format = input("Response format (url/b64_json): ") or "url"
+                result = tester.test_image(prompt, quality, response_format)
+                if 'file' in result:
+                    print(f"\nImage saved to: {result['file']}")
+                else:
+                    print(f"\nImage URL: {result['url']}")
                 print(f"Cost: €{result['cost_eur']:.4f}")
                 
             elif choice == "3":
-                image_path = input("Enter image path: ")
+                image_paths = [path.strip() for path in
+                               input("Enter image path (several separated by commas): ").split(",")
+                               if path.strip()]
                 prompt = input("Enter prompt: ")
-                result = tester.test_vision(image_path, prompt)
-                print(f"\nAnalysis: {result['response']}")
-                print(f"Cost: €{result['cost_eur']:.4f}")
+                if len(image_paths) > 1:
+                    results = tester.test_vision_packed(image_paths, prompt)
+                else:
+                    results = [tester.test_vision(image_paths[0], prompt)]
+                for image_path, result in zip(image_paths, results):
+                    print(f"\n{image_path}")
+                    print(f"Analysis: {result['response']}")
+                    print(f"Sent: {result['size'][0]}x{result['size'][1]} {result['mime']} - "
+                          f"saved {result['bytes_saved']:,} bytes, ~{result['tokens_saved']} tokens")
+                    print(f"Cost: €{result['cost_eur']:.4f}")
                 
             elif choice == "4":
                 audio_path = input("Enter audio file path: ")
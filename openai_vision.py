@@ -6,17 +6,190 @@
 import os
 import base64
 from openai import OpenAI
-from PIL import Image
+from PIL import Image, ImageOps
 import requests
 from io import BytesIO
+import time
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Constants for costs
 IMAGE_TOKENS_LOW = 85
 IMAGE_TOKENS_HIGH = 170
 TOKEN_COST_USD = 0.01  # Cost per 1K tokens
 EUR_RATE = 0.93
+PROBE_CHUNK_BYTES = 4096
+PROBE_MAX_BYTES = 256 * 1024  # Give up on a header larger than this (e.g. huge EXIF blocks)
+PROBE_TIMEOUT = (5, 10)  # (connect, read) seconds
+DOWNLOAD_TIMEOUT = (10, 60)
+SIZE_CACHE_ENTRIES = 1024
+LOW_DETAIL_MAX_SIDE = 512
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+INLINE_FORMATS = ["JPEG", "PNG", "WEBP", "GIF"]  # Sent as-is when already small enough
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"]
+DEFAULT_PROMPT = "What's in this image?"
+BATCH_WORKERS = 4
+BATCH_OUTPUT = "vision_results.jsonl"
+VISION_MODEL = "gpt-4o-mini"
+VISION_CACHE_DIR = os.path.join("cache", "vision")
+VISION_CACHE_ENTRIES = 5000  # Least recently used answers are evicted past this
+DHASH_THRESHOLD = 6  # Max differing bits (of 64) for two images to count as the same; -1 = exact only
+MAX_PACKED_IMAGES = 10
+PACK_INSTRUCTION = ("You are given {count} images, labelled Image 1 to Image {count}. Answer the request "
+                    "above for each image separately. Reply with only a JSON object of the form "
+                    '{{"answers": [{{"image": 1, "answer": "..."}}]}} with exactly one entry per image.')
 
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+session = requests.Session()
+size_cache = OrderedDict()
+size_cache_lock = threading.Lock()
+
+def dhash(data, hash_size=8):
+    # Difference hash: one bit per neighbouring-pixel comparison on a tiny grayscale copy,
+    # so re-exports and resized copies of an image land within a few bits of each other
+    img = Image.open(BytesIO(data))
+    img.draft("L", (hash_size * 8, hash_size * 8))  # JPEGs decode straight to a small size
+    pixels = list(img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = row * (hash_size + 1) + col
+            bits = (bits << 1) | (pixels[left] > pixels[left + 1])
+    return bits
+
+class VisionCache:
+    def __init__(self, cache_dir=VISION_CACHE_DIR, max_entries=VISION_CACHE_ENTRIES,
+                 threshold=DHASH_THRESHOLD):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._index = None  # file name -> (context, dhash), loaded on the first near lookup
+        self._lock = threading.Lock()
+
+    def _context(self, prompt, model, detail):
+        return hashlib.sha256(json.dumps([prompt, model, detail]).encode()).hexdigest()
+
+    def _name(self, digest, context):
+        return f"{hashlib.sha256((digest + context).encode()).hexdigest()}.json"
+
+    def _read(self, name):
+        path = os.path.join(self.cache_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                answer = json.load(f)["answer"]
+            os.utime(path)  # mtime doubles as the LRU clock
+            return answer
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = {}
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(self.cache_dir, name), encoding="utf-8") as f:
+                        entry = json.load(f)
+                    self._index[name] = (entry["context"], entry["dhash"])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return self._index
+
+    def get(self, digest, prompt, model, detail, data=None):
+        # Exact content match first, then the nearest perceptual match within the threshold.
+        # Returns (answer or None, dhash, near distance): the dhash lets a miss hand it on
+        # to put(), and the distance is the differing bits of a near hit (None otherwise)
+        context = self._context(prompt, model, detail)
+        with self._lock:
+            answer = self._read(self._name(digest, context))
+            if answer is not None:
+                self.exact_hits += 1
+                return answer, None, None
+
+        # Hashed even when near matching is off, so the entry put() stores can serve
+        # a later run that allows it
+        fingerprint = None
+        if data is not None:
+            try:
+                fingerprint = dhash(data)
+            except Exception:
+                fingerprint = None
+        with self._lock:
+            if fingerprint is not None and self.threshold >= 0:
+                best = None
+                for name, (entry_context, entry_hash) in self._load_index().items():
+                    if entry_context != context or entry_hash is None:
+                        continue
+                    distance = bin(fingerprint ^ entry_hash).count("1")
+                    if distance <= self.threshold and (best is None or distance < best[0]):
+                        best = (distance, name)
+                if best:
+                    answer = self._read(best[1])
+                    if answer is not None:
+                        self.near_hits += 1
+                        return answer, fingerprint, best[0]
+            self.misses += 1
+        return None, fingerprint, None
+
+    def put(self, digest, prompt, model, detail, answer, fingerprint=None):
+        context = self._context(prompt, model, detail)
+        name = self._name(digest, context)
+        path = os.path.join(self.cache_dir, name)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"context": context, "dhash": fingerprint, "prompt": prompt, "model": model,
+                       "detail": detail, "answer": answer}, f, ensure_ascii=False)
+        with self._lock:
+            os.replace(temp_path, path)
+            if self._index is not None:
+                self._index[name] = (context, fingerprint)
+            self._evict()
+
+    def _evict(self):
+        entries = sorted((name for name in os.listdir(self.cache_dir) if name.endswith(".json")),
+                         key=lambda name: os.path.getmtime(os.path.join(self.cache_dir, name)))
+        for name in entries[:max(0, len(entries) - self.max_entries)]:
+            os.remove(os.path.join(self.cache_dir, name))
+            if self._index is not None:
+                self._index.pop(name, None)
+
+    def stats(self):
+        hits = self.exact_hits + self.near_hits
+        total = hits + self.misses
+        rate = hits / total * 100 if total else 0
+        return (f"{self.exact_hits} exact + {self.near_hits} near hits / {self.misses} misses "
+                f"({rate:.0f}% hit rate)")
+
+vision_cache = VisionCache()
+
+def cache_note(near_distance):
+    if near_distance is None:
+        return "cached - no API call"
+    return f"cached from a similar image, {near_distance} of 64 hash bits apart - no API call"
+
+def cached_result(source, answer, near_distance, started):
+    # near_hit marks an answer reused from a different but similar-looking image
+    return {
+        "source": source,
+        "answer": answer,
+        "tokens": 0,
+        "cost_eur": 0,
+        "latency_s": round(time.perf_counter() - started, 3),
+        "cached": True,
+        "near_hit": near_distance is not None,
+        "match_distance": near_distance or 0
+    }
 
 def clear_screen():
     os.system('clear' if os.name != 'nt' else 'cls')
@@ -25,6 +198,45 @@ def encode_image(image_path):
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
 
+def tier_size(image_size, detail="auto"):
+    # Largest size the detail tier keeps: low fits 512x512; high fits 2048x2048
+    # and then brings the shortest side down to 768
+    width, height = image_size
+    if detail == "low":
+        scale = min(1, LOW_DETAIL_MAX_SIDE / max(width, height))
+    else:
+        scale = min(1, HIGH_DETAIL_MAX_SIDE / max(width, height))
+        shortest = min(width, height) * scale
+        if shortest > HIGH_DETAIL_SHORT_SIDE:
+            scale *= HIGH_DETAIL_SHORT_SIDE / shortest
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def prepare_image(raw, detail="auto"):
+    # Downscale to the detail tier and re-encode compactly;
+    # returns (bytes, mime type, original size, sent size)
+    img = Image.open(BytesIO(raw))
+    original_size = img.size
+    if img.format in INLINE_FORMATS and tier_size(img.size, detail) == img.size:
+        return raw, Image.MIME[img.format], original_size, original_size
+
+    img = ImageOps.exif_transpose(img)
+    img = img.resize(tier_size(img.size, detail), Image.LANCZOS)
+    buffer = BytesIO()
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        img.save(buffer, format="PNG", optimize=True)
+        mime = "image/png"
+    else:
+        img.convert("RGB").save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        mime = "image/jpeg"
+    return buffer.getvalue(), mime, original_size, img.size
+
+def report_upload(raw, data, mime, original_size, sent_size, detail):
+    original_tokens, _ = calculate_image_cost(original_size, detail)
+    tokens, _ = calculate_image_cost(sent_size, detail)
+    print(f"\nUpload: {sent_size[0]}x{sent_size[1]} {mime}, {len(data):,} bytes")
+    print(f"Saved: {len(raw) - len(data):,} bytes and ~{original_tokens - tokens} tokens "
+          f"vs the original {original_size[0]}x{original_size[1]}")
+
 def calculate_image_cost(image_size, detail="auto"):
     if detail == "low":
         tokens = IMAGE_TOKENS_LOW
@@ -40,72 +252,442 @@ def calculate_image_cost(image_size, detail="auto"):
     cost_eur = cost_usd * EUR_RATE
     return tokens, cost_eur
 
-def analyze_image_url(url, detail="auto"):
+def parse_image_size(data):
+    # Read (width, height) from the first bytes of a PNG, GIF, BMP, WEBP or JPEG;
+    # None means more bytes are needed or the format is unknown
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little")
+    if data[:2] == b"BM" and len(data) >= 26:
+        return (int.from_bytes(data[18:22], "little", signed=True),
+                abs(int.from_bytes(data[22:26], "little", signed=True)))
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            return (int.from_bytes(data[26:28], "little") & 0x3FFF,
+                    int.from_bytes(data[28:30], "little") & 0x3FFF)
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    if data[:2] == b"\xff\xd8":
+        # Walk the JPEG segments until a start-of-frame marker
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return int.from_bytes(data[i + 7:i + 9], "big"), int.from_bytes(data[i + 5:i + 7], "big")
+            if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                i += 2
+                continue
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+def probe_image_size(url):
+    # Fetch only the leading bytes of a remote image to learn its dimensions.
+    # The size only feeds the cost estimate, so a failed probe returns None
+    # rather than stopping the analysis (the API fetches the URL itself)
+    with size_cache_lock:
+        if url in size_cache:
+            size_cache.move_to_end(url)
+            return size_cache[url]
+
+    size = None
+    data = bytearray()
     try:
-        # Get image size for cost calculation
-        response = requests.get(url)
-        img = Image.open(BytesIO(response.content))
-        tokens, cost = calculate_image_cost(img.size, detail)
+        with session.get(url, stream=True, timeout=PROBE_TIMEOUT,
+                         headers={"Range": f"bytes=0-{PROBE_MAX_BYTES - 1}"}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=PROBE_CHUNK_BYTES):
+                data.extend(chunk)
+                size = parse_image_size(data)
+                if size or len(data) >= PROBE_MAX_BYTES:
+                    break
+    except requests.RequestException as e:
+        print(f"Could not probe the size of {url} ({e}) - cost will not be estimated")
+        return None
+
+    if size:
+        with size_cache_lock:
+            size_cache[url] = size
+            if len(size_cache) > SIZE_CACHE_ENTRIES:
+                size_cache.popitem(last=False)
+    return size
+
+def download_image(url):
+    response = session.get(url, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+def analyze_image_url(url, detail="auto", download=False):
+    # download=True fetches the whole image and sends it inline instead of
+    # letting the server fetch the URL; only needed for client-side processing
+    try:
+        image_url = url
+        content = download_image(url) if download else None
+        digest = hashlib.sha256(content if download else url.encode()).hexdigest()
+        answer, fingerprint, near_distance = vision_cache.get(digest, DEFAULT_PROMPT, VISION_MODEL,
+                                                              detail, content)
+        if answer is not None:
+            print(f"\nAnalysis Result ({cache_note(near_distance)}):\n{answer}")
+            print(f"\nCache: {vision_cache.stats()}")
+            return
+        if download:
+            data, mime, original_size, size = prepare_image(content, detail)
+            report_upload(content, data, mime, original_size, size, detail)
+            image_url = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+        else:
+            size = probe_image_size(url)
+        if size:
+            tokens, cost = calculate_image_cost(size, detail)
         
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=VISION_MODEL,
             messages=[{
                 "role": "user",
                 "content": [{
                     "type": "text",
-                    "text": "What's in this image?"
+                    "text": DEFAULT_PROMPT
                 }, {
                     "type": "image_url",
                     "image_url": {
-                        "url": url,
+                        "url": image_url,
                         "detail": detail
                     }
                 }]
             }],
             max_tokens=300
         )
+        answer = response.choices[0].message.content
+        vision_cache.put(digest, DEFAULT_PROMPT, VISION_MODEL, detail, answer, fingerprint)
         
-        print(f"\nAnalysis Result:\n{response.choices[0].message.content}")
+        print(f"\nAnalysis Result:\n{answer}")
         print(f"\nToken Usage:")
-        print(f"Image tokens: {tokens}")
-        print(f"Cost: €{cost:.4f}")
+        if size:
+            print(f"Image tokens: {tokens}")
+            print(f"Cost: €{cost:.4f}")
+        else:
+            print("Image size could not be read from the header - cost not estimated")
+        print(f"Cache: {vision_cache.stats()}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
 
 def analyze_local_image(image_path, detail="auto"):
     try:
-        # Get image size for cost calculation
-        img = Image.open(image_path)
-        tokens, cost = calculate_image_cost(img.size, detail)
+        with open(image_path, "rb") as image_file:
+            raw = image_file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        answer, fingerprint, near_distance = vision_cache.get(digest, DEFAULT_PROMPT, VISION_MODEL,
+                                                              detail, raw)
+        if answer is not None:
+            print(f"\nAnalysis Result ({cache_note(near_distance)}):\n{answer}")
+            print(f"\nCache: {vision_cache.stats()}")
+            return
+        data, mime, original_size, size = prepare_image(raw, detail)
+        report_upload(raw, data, mime, original_size, size, detail)
+        tokens, cost = calculate_image_cost(size, detail)
         
-        base64_image = encode_image(image_path)
+        base64_image = base64.b64encode(data).decode('utf-8')
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=VISION_MODEL,
             messages=[{
                 "role": "user",
                 "content": [{
                     "type": "text",
-                    "text": "What's in this image?"
+                    "text": DEFAULT_PROMPT
                 }, {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}",
+                        "url": f"data:{mime};base64,{base64_image}",
                         "detail": detail
                     }
                 }]
             }],
             max_tokens=300
         )
+        answer = response.choices[0].message.content
+        vision_cache.put(digest, DEFAULT_PROMPT, VISION_MODEL, detail, answer, fingerprint)
         
-        print(f"\nAnalysis Result:\n{response.choices[0].message.content}")
+        print(f"\nAnalysis Result:\n{answer}")
         print(f"\nToken Usage:")
         print(f"Image tokens: {tokens}")
         print(f"Cost: €{cost:.4f}")
+        print(f"Cache: {vision_cache.stats()}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
 
+def image_content(source, detail="auto", raw=None):
+    # Build the image_url part for a URL or local path (raw = its bytes, if already read);
+    # returns (content, image size or None if it could not be probed)
+    if source.startswith(("http://", "https://")):
+        size = probe_image_size(source)
+        url = source
+    else:
+        if raw is None:
+            with open(source, "rb") as image_file:
+                raw = image_file.read()
+        data, mime, _, size = prepare_image(raw, detail)
+        url = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+    return {"type": "image_url", "image_url": {"url": url, "detail": detail}}, size
+
+def read_source(source):
+    # Local files are read once for hashing and upload; URLs are keyed on the URL itself
+    raw = None
+    if not source.startswith(("http://", "https://")):
+        with open(source, "rb") as image_file:
+            raw = image_file.read()
+    return raw, hashlib.sha256(raw if raw is not None else source.encode()).hexdigest()
+
+def analyze_image(source, prompt=DEFAULT_PROMPT, detail="auto", max_tokens=300, cache=vision_cache):
+    started = time.perf_counter()
+    raw, digest = read_source(source)
+    fingerprint = None
+    if cache:
+        answer, fingerprint, near_distance = cache.get(digest, prompt, VISION_MODEL, detail, raw)
+        if answer is not None:
+            return cached_result(source, answer, near_distance, started)
+
+    content, size = image_content(source, detail, raw)
+    response = client.chat.completions.create(
+        model=VISION_MODEL,
+        messages=[{
+            "role": "user",
+            "content": [{"type": "text", "text": prompt}, content]
+        }],
+        max_tokens=max_tokens
+    )
+    answer = response.choices[0].message.content
+    if cache:
+        cache.put(digest, prompt, VISION_MODEL, detail, answer, fingerprint)
+    usage = response.usage
+    return {
+        "source": source,
+        "answer": answer,
+        "tokens": usage.total_tokens,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "image_tokens_estimate": calculate_image_cost(size, detail)[0] if size else None,
+        "cost_eur": round((usage.total_tokens / 1000) * TOKEN_COST_USD * EUR_RATE, 6),
+        "latency_s": round(time.perf_counter() - started, 3),
+        "cached": False
+    }
+
+def parse_packed_answers(text, count):
+    answers = {}
+    for entry in json.loads(text)["answers"]:
+        answers[int(entry["image"])] = str(entry["answer"])
+    if sorted(answers) != list(range(1, count + 1)):
+        raise ValueError(f"expected answers for images 1-{count}, got {sorted(answers)}")
+    return [answers[i] for i in range(1, count + 1)]
+
+def analyze_images_packed(sources, prompt=DEFAULT_PROMPT, detail="auto", max_tokens=300,
+                          cache=vision_cache):
+    # Send several images in one request and split the JSON reply back per image;
+    # max_tokens is per image. Returns one result per source, in order; a source that
+    # could not be read gets {"source", "error"} instead
+    started = time.perf_counter()
+    results = {}
+    todo = []
+    for source in sources:
+        try:
+            raw, digest = read_source(source)
+            fingerprint = None
+            if cache:
+                answer, fingerprint, near_distance = cache.get(digest, prompt, VISION_MODEL, detail, raw)
+                if answer is not None:
+                    results[source] = cached_result(source, answer, near_distance, started)
+                    continue
+            content, size = image_content(source, detail, raw)
+        except Exception as e:
+            results[source] = {"source": source, "error": str(e)}
+            continue
+        todo.append((source, digest, fingerprint, content, size))
+
+    if todo:
+        parts = [{"type": "text", "text": f"{prompt}\n\n{PACK_INSTRUCTION.format(count=len(todo))}"}]
+        for i, (_, _, _, content, _) in enumerate(todo, 1):
+            parts += [{"type": "text", "text": f"Image {i}:"}, content]
+        response = client.chat.completions.create(
+            model=VISION_MODEL,
+            messages=[{"role": "user", "content": parts}],
+            max_tokens=max_tokens * len(todo),
+            response_format={"type": "json_object"}
+        )
+        latency = round(time.perf_counter() - started, 3)
+        usage = response.usage
+        total_cost = (usage.total_tokens / 1000) * TOKEN_COST_USD * EUR_RATE
+        try:
+            answers = parse_packed_answers(response.choices[0].message.content, len(todo))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Packed reply could not be split ({e}) - asking for each image separately")
+            answers = None
+
+        if answers is None:
+            # The packed call was still paid for, so its cost is spread over the retries
+            for source, digest, fingerprint, _, _ in todo:
+                try:
+                    result = analyze_image(source, prompt, detail, max_tokens, cache=None)
+                except Exception as e:
+                    results[source] = {"source": source, "error": str(e)}
+                    continue
+                result["cost_eur"] = round(result["cost_eur"] + total_cost / len(todo), 6)
+                if cache:
+                    cache.put(digest, prompt, VISION_MODEL, detail, result["answer"], fingerprint)
+                results[source] = result
+        else:
+            # Each image pays for its own image tokens plus an even share of the
+            # prompt and answer tokens
+            image_tokens = []
+            image_costs = []
+            for _, _, _, _, size in todo:
+                tokens, cost = calculate_image_cost(size, detail) if size else (0, 0)
+                image_tokens.append(tokens)
+                image_costs.append(cost)
+            shared_tokens = max(0, usage.total_tokens - sum(image_tokens)) / len(todo)
+            shared_cost = max(0, total_cost - sum(image_costs)) / len(todo)
+            # Estimates can overshoot the billed total; scale so the split adds up to it
+            scale = min(1, total_cost / (sum(image_costs) + shared_cost * len(todo) or 1))
+            token_scale = min(1, usage.total_tokens / (sum(image_tokens) + shared_tokens * len(todo) or 1))
+            for (source, digest, fingerprint, _, size), answer, tokens, cost in zip(
+                    todo, answers, image_tokens, image_costs):
+                if cache:
+                    cache.put(digest, prompt, VISION_MODEL, detail, answer, fingerprint)
+                results[source] = {
+                    "source": source,
+                    "answer": answer,
+                    "tokens": round((tokens + shared_tokens) * token_scale),
+                    "image_tokens_estimate": tokens if size else None,
+                    "cost_eur": round((cost + shared_cost) * scale, 6),
+                    "latency_s": latency,
+                    "cached": False,
+                    "packed": len(todo)
+                }
+    return [results[source] for source in sources]
+
+def analyze_local_images_packed(image_paths, detail="auto"):
+    try:
+        results = analyze_images_packed(image_paths, detail=detail)
+        total = 0
+        for result in results:
+            print(f"\n{result['source']}:")
+            if "error" in result:
+                print(f"Error: {result['error']}")
+                continue
+            print(result["answer"])
+            print(f"Cost: €{result['cost_eur']:.4f}{' (cached)' if result['cached'] else ''}")
+            total += result["cost_eur"]
+        print(f"\nTotal cost: €{total:.4f}")
+        print(f"Cache: {vision_cache.stats()}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+
+def iter_sources(source):
+    # A directory is walked for images; any other file lists one path or URL per line
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    yield os.path.join(root, name)
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+def completed_sources(output_file):
+    # Sources already answered in an earlier run; failed ones are tried again
+    done = set()
+    line = "\n"
+    if os.path.exists(output_file):
+        with open(output_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by an interrupted run
+                if entry.get("status") == "done":
+                    done.add(entry["source"])
+        if not line.endswith("\n"):
+            # Keep new results off the end of a half-written line
+            with open(output_file, "a", encoding="utf-8") as f:
+                f.write("\n")
+    return done
+
+def run_vision_batch(source, output_file=BATCH_OUTPUT, prompt=DEFAULT_PROMPT, detail="auto",
+                     workers=BATCH_WORKERS, max_tokens=300, cache=vision_cache, pack=1):
+    # pack > 1 sends that many images per request
+    done_before = completed_sources(output_file)
+    stats = {"done": 0, "failed": 0, "skipped": 0, "cost_eur": 0}
+    pending = {}
+    workers = max(1, workers)
+    pack = min(max(1, pack), MAX_PACKED_IMAGES)
+    started = time.time()
+
+    def analyze_group(group):
+        if len(group) == 1:
+            return [analyze_image(group[0], prompt, detail, max_tokens, cache)]
+        return analyze_images_packed(group, prompt, detail, max_tokens, cache)
+
+    def collect(finished, results):
+        for future in finished:
+            group = pending.pop(future)
+            try:
+                entries = future.result()
+            except Exception as e:
+                entries = [{"source": item, "error": str(e)} for item in group]
+            for entry in entries:
+                if "error" in entry:
+                    entry = {**entry, "status": "failed"}
+                    stats["failed"] += 1
+                else:
+                    entry = {**entry, "status": "done"}
+                    stats["done"] += 1
+                    stats["cost_eur"] += entry["cost_eur"]
+                results.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                print(f"[{stats['done'] + stats['failed']}] {entry['status']}: {entry['source']}")
+            results.flush()
+
+    def submit(group, results):
+        pending[executor.submit(analyze_group, group)] = group
+        if len(pending) >= workers * 2:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished, results)
+
+    with open(output_file, "a", encoding="utf-8") as results, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        group = []
+        try:
+            for item in iter_sources(source):
+                if item in done_before:
+                    stats["skipped"] += 1
+                    continue
+                group.append(item)
+                if len(group) == pack:
+                    submit(group, results)
+                    group = []
+            if group:
+                submit(group, results)
+        finally:
+            # Answers already paid for are written even if the run is interrupted
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished, results)
+
+    elapsed_minutes = max((time.time() - started) / 60, 1e-6)
+    stats["images_per_minute"] = round((stats["done"] + stats["failed"]) / elapsed_minutes, 2)
+    return stats
+
 def main_menu():
     while True:
         clear_screen()
@@ -113,9 +695,10 @@ def main_menu():
         print("1. Analyze Image from URL")
         print("2. Analyze Local Image")
         print("3. High Detail Analysis")
-        print("4. Exit")
+        print("4. Analyze Several Local Images (one request)")
+        print("5. Exit")
         
-        choice = input("\nEnter your choice (1-4): ")
+        choice = input("\nEnter your choice (1-5): ")
         
         if choice == "1":
             url = input("\nEnter image URL: ")
@@ -134,10 +717,50 @@ def main_menu():
                 path = input("\nEnter image path: ")
                 analyze_local_image(path, "high")
         elif choice == "4":
+            paths = input(f"\nEnter up to {MAX_PACKED_IMAGES} image paths, separated by commas: ")
+            paths = [path.strip() for path in paths.split(",") if path.strip()]
+            if paths:
+                analyze_local_images_packed(paths[:MAX_PACKED_IMAGES])
+        elif choice == "5":
             print("\nGoodbye!")
             break
             
         input("\nPress Enter to continue...")
 
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Vision Analyzer")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="Directory of images, or a file listing one path or URL per line")
+    parser.add_argument("--output", default=BATCH_OUTPUT,
+                        help="JSONL results file; sources already done in it are skipped")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--detail", choices=["auto", "low", "high"], default="auto")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--max-tokens", type=int, default=300)
+    parser.add_argument("--similarity", type=int, default=-1,
+                        help="Max differing hash bits (of 64) to reuse a cached answer from a similar "
+                             f"image, e.g. {DHASH_THRESHOLD}; default -1 = exact matches only")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API")
+    parser.add_argument("--pack", type=int, default=1,
+                        help=f"Images per request (up to {MAX_PACKED_IMAGES}); replies are split per image")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        main_menu()
+        return 0
+
+    vision_cache.threshold = args.similarity
+    stats = run_vision_batch(args.batch, args.output, args.prompt, args.detail,
+                             args.workers, args.max_tokens, None if args.no_cache else vision_cache,
+                             args.pack)
+    print("\nBatch Summary:")
+    print(f"Done: {stats['done']}  Failed: {stats['failed']}  Skipped: {stats['skipped']}")
+    print(f"Throughput: {stats['images_per_minute']} images/min")
+    print(f"Cost: €{stats['cost_eur']:.4f}")
+    if not args.no_cache:
+        print(f"Cache: {vision_cache.stats()}")
+    print(f"Results: {args.output}")
+    return 1 if stats["failed"] else 0
+
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    raise SystemExit(run_cli())
\ No newline at end of file